@@ -0,0 +1,22 @@
+"""
+Gunicorn Configuration
+Production settings for the Socket.IO web frontends; `main()` in each
+module remains the Werkzeug development path.
+
+Usage:
+    gunicorn -c gunicorn_conf.py --chdir src 'visualization.viewer_3d:app'
+    gunicorn -c gunicorn_conf.py --chdir src -b 0.0.0.0:5000 'visualization.dashboard:app'
+"""
+
+bind = '0.0.0.0:5001'
+
+# Socket.IO session state lives in-process, so a single eventlet worker
+# must own all rooms. To scale horizontally, configure every worker
+# with a shared broker instead, e.g.
+#   SocketIO(app, message_queue='redis://localhost:6379/0')
+# and raise the worker count.
+workers = 1
+worker_class = 'eventlet'
+
+# Keep connections open across the Socket.IO polling handshake
+keepalive = 65
@@ -5,116 +5,543 @@ Generates comprehensive reports with analytics, predictions, and visualizations.
 
 import json
 import numpy as np
+from functools import cached_property
+
+try:
+    import orjson
+except ImportError:  # Fall back to stdlib json if orjson is unavailable
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # Large logs fall back to one-shot parsing
+    ijson = None
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # Run kernels as plain Python if numba is unavailable
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+    prange = range
+    NUMBA_AVAILABLE = False
 import pandas as pd
-import matplotlib.pyplot as plt
 import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+matplotlib.rcParams['path.simplify_threshold'] = 1.0  # Let Agg drop sub-pixel segments
+matplotlib.rcParams['agg.path.chunksize'] = 10000  # Chunk long paths inside Agg
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 import os
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+if __package__ in (None, ''):  # direct script execution only
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from digital_twin.core import StreamingMetrics
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _rolling_efficiency(pos, soc, window, capacity):
+    """Rolling km/kWh over a fixed window of samples.
+
+    Fuses the diff + rolling-sum + divide chain into one cache-friendly
+    sweep over the raw arrays; compiled and parallelized by numba when
+    it is installed.
+    """
+    n = pos.shape[0]
+    out = np.empty(n)
+    out[:window] = np.nan
+    for i in prange(window, n):
+        distance = pos[i] - pos[i - window]
+        energy = 0.0
+        for j in range(i - window + 1, i + 1):
+            energy += abs(soc[j] - soc[j - 1])
+        out[i] = distance / (energy * capacity + 1e-3)
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def _fused_reduce(A):
+    """Single-pass max/sum/first/last over the columns of a float32 matrix.
+
+    One fused loop touches every element exactly once; with fastmath the
+    inner loop auto-vectorizes to SIMD width 8 for float32, where separate
+    per-column reductions each pay their own dispatch and memory pass.
+    """
+    n, m = A.shape
+    col_max = np.empty(m)
+    col_sum = np.zeros(m)
+    first = np.empty(m)
+    last = np.empty(m)
+    for j in range(m):
+        col_max[j] = A[0, j]
+        first[j] = A[0, j]
+        last[j] = A[n - 1, j]
+    for i in range(n):
+        for j in range(m):
+            value = A[i, j]
+            col_sum[j] += value
+            if value > col_max[j]:
+                col_max[j] = value
+    return col_max, col_sum / n, first, last
+
+
+def _decimate(x, y, target=2000):
+    """Stride-decimate a series pair to at most `target` plot points.
+
+    Agg draw time is linear in segment count and a 2000-point line is
+    visually identical to the full series at report resolution.
+    """
+    n = len(x)
+    if n <= target:
+        return x, y
+    idx = np.linspace(0, n - 1, target).astype(np.int64)
+    return x[idx], y[idx]
+
+
+def _render_telemetry_charts(df: pd.DataFrame, output_dir: str):
+    """Render the 3x3 telemetry chart grid"""
+    # Time axis shared by the subplots, capped at ~2000 points
+    t = df['simulation_time'].to_numpy()
+
+    # One spec per time-series panel: (column, style, title, ylabel,
+    # warning threshold). The ninth panel (rolling efficiency over
+    # distance) is drawn separately below.
+    panels = [
+        ('speed_kmh', 'b-', 'Vehicle Speed Over Time', 'Speed (km/h)', None),
+        ('battery_soc', 'g-', 'Battery State of Charge', 'SOC (%)', None),
+        ('motor_power_kw', 'r-', 'Motor Power Output', 'Power (kW)', None),
+        ('motor_temp_c', 'orange', 'Motor Temperature', 'Temperature (°C)', 100),
+        ('battery_temp_c', 'purple', 'Battery Temperature', 'Temperature (°C)', 45),
+        ('motor_torque_nm', 'brown', 'Motor Torque', 'Torque (Nm)', None),
+        ('motor_power_kw', 'c-', 'Instantaneous Energy Consumption', 'Power (kW)', None),
+        ('battery_current', 'm-', 'Battery Current', 'Current (A)', None)
+    ]
+
+    # Build the figure without pyplot: nothing is registered in the Gcf
+    # figure manager, so the ~25 MB canvas is freed as soon as the
+    # figure goes out of scope
+    fig = Figure(figsize=(16, 12), layout='constrained')
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(3, 3).ravel()
+
+    for ax, (column, style, title, ylabel, warning) in zip(axes, panels):
+        ax.plot(*_decimate(t, df[column].to_numpy()), style, linewidth=2)
+        if warning is not None:
+            ax.axhline(y=warning, color='r', linestyle='--',
+                       label='Warning threshold')
+            ax.legend()
+        ax.set(xlabel='Time (s)', ylabel=ylabel, title=title)
+        ax.grid(True, alpha=0.3)
+
+    # 9. Efficiency over distance
+    ax9 = axes[8]
+    if len(df) > 10:
+        rolling_efficiency = _rolling_efficiency(
+            df['position_km'].to_numpy(dtype=np.float64),
+            df['battery_soc'].to_numpy(dtype=np.float64),
+            10, 0.75  # 10-sample window, 75 kWh capacity
+        )
+        ax9.plot(*_decimate(df['position_km'].to_numpy(), rolling_efficiency),
+                 'y-', linewidth=2)
+    ax9.set(xlabel='Distance (km)', ylabel='Efficiency (km/kWh)',
+            title='Energy Efficiency')
+    ax9.grid(True, alpha=0.3)
+
+    output_path = os.path.join(output_dir, 'telemetry_analysis.png')
+    # 120 dpi is plenty for on-screen reports; rasterization and PNG
+    # encoding cost scale with dpi^2
+    fig.savefig(output_path, dpi=120, bbox_inches='tight')
+
+    print(f"Visualizations saved to: {output_path}")
+
+
+def _render_health_dashboard(df: pd.DataFrame, output_dir: str):
+    """Render the 2x2 health monitoring dashboard"""
+    fig = Figure(figsize=(12, 10), layout='constrained')
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(2, 2)
+    
+    # Motor health
+    axes[0, 0].plot(*_decimate(df['simulation_time'].to_numpy(), df['motor_health'].to_numpy()), 'b-', linewidth=2)
+    axes[0, 0].axhline(y=90, color='orange', linestyle='--', label='Service threshold')
+    axes[0, 0].axhline(y=80, color='r', linestyle='--', label='Critical threshold')
+    axes[0, 0].set_xlabel('Time (s)')
+    axes[0, 0].set_ylabel('Health (%)')
+    axes[0, 0].set_title('Motor Health Score')
+    axes[0, 0].legend()
+    axes[0, 0].grid(True, alpha=0.3)
+    
+    # Battery health
+    axes[0, 1].plot(*_decimate(df['simulation_time'].to_numpy(), df['battery_health'].to_numpy()), 'g-', linewidth=2)
+    axes[0, 1].axhline(y=90, color='orange', linestyle='--', label='Service threshold')
+    axes[0, 1].axhline(y=80, color='r', linestyle='--', label='Critical threshold')
+    axes[0, 1].set_xlabel('Time (s)')
+    axes[0, 1].set_ylabel('Health (%)')
+    axes[0, 1].set_title('Battery State of Health')
+    axes[0, 1].legend()
+    axes[0, 1].grid(True, alpha=0.3)
+    
+    # Temperature distribution over fixed, physically meaningful bins;
+    # np.histogram on the raw arrays skips plt.hist's autobinning passes
+    # and keeps the axes identical across runs
+    temp_edges = np.linspace(0, 120, 21)
+    width = np.diff(temp_edges)
+    motor_counts, _ = np.histogram(df['motor_temp_c'].to_numpy(), temp_edges)
+    battery_counts, _ = np.histogram(df['battery_temp_c'].to_numpy(), temp_edges)
+    axes[1, 0].bar(temp_edges[:-1], motor_counts, width=width * 0.45,
+                   align='edge', alpha=0.7, label='Motor')
+    axes[1, 0].bar(temp_edges[:-1] + width * 0.45, battery_counts,
+                   width=width * 0.45, align='edge', alpha=0.7, label='Battery')
+    axes[1, 0].set_xlabel('Temperature (°C)')
+    axes[1, 0].set_ylabel('Frequency')
+    axes[1, 0].set_title('Temperature Distribution')
+    axes[1, 0].legend()
+    axes[1, 0].grid(True, alpha=0.3)
+    
+    # Power usage histogram, fixed bins up to the motor's 150 kW rating
+    power_edges = np.linspace(0, 150, 31)
+    power_counts, _ = np.histogram(df['motor_power_kw'].to_numpy(), power_edges)
+    axes[1, 1].bar(power_edges[:-1], power_counts, width=np.diff(power_edges),
+                   align='edge', color='purple', alpha=0.7)
+    axes[1, 1].set_xlabel('Power (kW)')
+    axes[1, 1].set_ylabel('Frequency')
+    axes[1, 1].set_title('Power Usage Distribution')
+    axes[1, 1].grid(True, alpha=0.3)
+    
+    output_path = os.path.join(output_dir, 'health_dashboard.png')
+    fig.savefig(output_path, dpi=120, bbox_inches='tight')
+    
+    print(f"Health dashboard saved to: {output_path}")
+
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+def _render_from_parquet(parquet_path: str, output_dir: str, renderer):
+    """Worker entry point: load the frame and run one renderer.
+
+    Each worker process re-reads the telemetry from Parquet, which is
+    cheaper than pickling the float arrays across the process boundary.
+    """
+    df = pd.read_parquet(parquet_path)
+    renderer(df, output_dir)
 
 
 class DigitalTwinAnalyzer:
     """Analyzes telemetry data and generates insights"""
     
-    def __init__(self, telemetry_log: List[Dict]):
+    # Numeric columns referenced by the analytics methods below
+    METRIC_COLUMNS = [
+        'speed_kmh', 'position_km', 'acceleration_mps2',
+        'motor_power_kw', 'motor_temp_c', 'motor_health',
+        'battery_soc', 'battery_temp_c', 'battery_health'
+    ]
+
+    # Everything analysis or plotting touches; Parquet loads prune to these
+    ANALYSIS_COLUMNS = METRIC_COLUMNS + [
+        'motor_torque_nm', 'motor_rpm', 'battery_voltage', 'battery_current'
+    ]
+
+    def __init__(self, telemetry_log: List[Dict], streaming_metrics=None):
+        """
+        Args:
+            telemetry_log: Raw telemetry entries from the simulator.
+            streaming_metrics: Optional StreamingMetrics accumulated during
+                the simulation. When provided, summary metrics are read from
+                it directly and the DataFrame is only materialized if time
+                series are actually needed (i.e. for visualizations).
+        """
         self.telemetry_log = telemetry_log
-        self.df = self._convert_to_dataframe()
-        
+        self.streaming_metrics = streaming_metrics
+
+    @cached_property
+    def df(self) -> pd.DataFrame:
+        """Telemetry as a DataFrame, materialized on first access"""
+        return self._convert_to_dataframe()
+
+    @cached_property
+    def _reductions(self) -> Dict[str, Dict[str, float]]:
+        """Fuse all column reductions into three linear sweeps.
+
+        The analytics methods need max/mean/first/last of the same handful
+        of columns. When streaming metrics were accumulated during the
+        simulation they already hold these values in O(1); otherwise one
+        pass over a contiguous 2-D array computes them all, avoiding a
+        re-scan per metric, anomaly check and maintenance prediction.
+        """
+        sm = self.streaming_metrics
+        if sm is not None and sm.count:
+            return {
+                'max': {
+                    'speed_kmh': sm.max_speed_kmh,
+                    'position_km': sm.last_position_km,
+                    'acceleration_mps2': sm.max_acceleration_mps2,
+                    'motor_power_kw': sm.max_motor_power_kw,
+                    'motor_temp_c': sm.max_motor_temp_c,
+                    'battery_temp_c': sm.max_battery_temp_c
+                },
+                'mean': {
+                    'speed_kmh': sm.avg_speed_kmh,
+                    'motor_power_kw': sm.avg_motor_power_kw,
+                    'motor_temp_c': sm.avg_motor_temp_c,
+                    'battery_temp_c': sm.avg_battery_temp_c
+                },
+                'first': {'battery_soc': sm.first_battery_soc},
+                'last': {
+                    'battery_soc': sm.last_battery_soc,
+                    'battery_health': sm.last_battery_health,
+                    'motor_health': sm.last_motor_health
+                }
+            }
+
+        subset = self.df[self.METRIC_COLUMNS]
+
+        if len(subset) == 0:
+            # The compiled kernel reads row 0 unconditionally, which on
+            # an empty frame is an out-of-bounds access under numba
+            # (no bounds checking); fail like the pandas path would.
+            raise IndexError("cannot reduce empty telemetry data")
+
+        if NUMBA_AVAILABLE:
+            # Compiled fused kernel: one SIMD pass over the whole matrix
+            arr = np.ascontiguousarray(subset.to_numpy(dtype=np.float32))
+            col_max, col_mean, first, last = _fused_reduce(arr)
+            return {
+                'max': dict(zip(self.METRIC_COLUMNS, col_max)),
+                'mean': dict(zip(self.METRIC_COLUMNS, col_mean)),
+                'first': dict(zip(self.METRIC_COLUMNS, first)),
+                'last': dict(zip(self.METRIC_COLUMNS, last))
+            }
+
+        # One agg call lets pandas run every reduction through its Cython
+        # kernels without a per-Series Python dispatch (and without
+        # copying the columns into a separate matrix first)
+        reduced = subset.agg(['max', 'mean'])
+        return {
+            'max': reduced.loc['max'].to_dict(),
+            'mean': reduced.loc['mean'].to_dict(),
+            'first': subset.iloc[0].to_dict(),
+            'last': subset.iloc[-1].to_dict()
+        }
+
+    @property
+    def _col_max(self) -> Dict[str, float]:
+        return self._reductions['max']
+
+    @property
+    def _col_mean(self) -> Dict[str, float]:
+        return self._reductions['mean']
+
+    @property
+    def _col_first(self) -> Dict[str, float]:
+        return self._reductions['first']
+
+    @property
+    def _col_last(self) -> Dict[str, float]:
+        return self._reductions['last']
+        
+    # Maps flattened telemetry keys (from json_normalize with sep='_')
+    # back to the short column names used throughout the analyzer.
+    COLUMN_RENAMES = {
+        'vehicle_speed_kmh': 'speed_kmh',
+        'vehicle_position_km': 'position_km',
+        'vehicle_acceleration_mps2': 'acceleration_mps2',
+        'motor_temperature_c': 'motor_temp_c',
+        'motor_health_score': 'motor_health',
+        'battery_soc_percent': 'battery_soc',
+        'battery_current_a': 'battery_current',
+        'battery_temperature_c': 'battery_temp_c',
+        'battery_health_soh': 'battery_health'
+    }
+
+    @staticmethod
+    def _load_metrics_sidecar(path: str):
+        """Load the StreamingMetrics sidecar exported next to a telemetry
+        file, or None if it is missing or older than the telemetry."""
+        metrics_path = os.path.splitext(path)[0] + '.metrics.json'
+        try:
+            if os.stat(metrics_path).st_mtime >= os.stat(path).st_mtime:
+                return StreamingMetrics.from_json(metrics_path)
+        except (OSError, TypeError, ValueError):
+            pass
+        return None
+
+    @classmethod
+    def from_json_path(cls, path: str) -> 'DigitalTwinAnalyzer':
+        """Build an analyzer from a JSON telemetry file.
+
+        With ijson installed the records are streamed straight into
+        per-column lists, so peak memory stays near the numeric payload
+        instead of materializing every nested dict at once. Without it,
+        the file is parsed in one shot (orjson when available).
+        """
+        if ijson is None:
+            with open(path, 'rb') as f:
+                if orjson is not None:
+                    telemetry_log = orjson.loads(f.read())
+                else:
+                    telemetry_log = json.load(f)
+            return cls(telemetry_log,
+                       streaming_metrics=cls._load_metrics_sidecar(path))
+
+        timestamps = []
+        columns = {col: [] for col in ['simulation_time'] + cls.ANALYSIS_COLUMNS}
+        with open(path, 'rb') as f:
+            for entry in ijson.items(f, 'item'):
+                vehicle = entry['vehicle']
+                motor = entry['motor']
+                battery = entry['battery']
+
+                timestamps.append(entry.get('timestamp', ''))
+                columns['simulation_time'].append(entry.get('simulation_time', 0))
+                columns['speed_kmh'].append(vehicle['speed_kmh'])
+                columns['position_km'].append(vehicle['position_km'])
+                columns['acceleration_mps2'].append(vehicle['acceleration_mps2'])
+                columns['motor_power_kw'].append(motor['power_kw'])
+                columns['motor_torque_nm'].append(motor['torque_nm'])
+                columns['motor_rpm'].append(motor['rpm'])
+                columns['motor_temp_c'].append(motor['temperature_c'])
+                columns['motor_health'].append(motor['health_score'])
+                columns['battery_soc'].append(battery['soc_percent'])
+                columns['battery_voltage'].append(battery['voltage'])
+                columns['battery_current'].append(battery['current_a'])
+                columns['battery_temp_c'].append(battery['temperature_c'])
+                columns['battery_health'].append(battery['health_soh'])
+
+        # ijson yields Decimal; np.asarray converts while downcasting
+        data = {'timestamp': pd.Categorical(timestamps)}
+        data.update({col: np.asarray(values, dtype=np.float32)
+                     for col, values in columns.items()})
+
+        analyzer = cls([], streaming_metrics=cls._load_metrics_sidecar(path))
+        analyzer.df = pd.DataFrame(data, copy=False)
+        return analyzer
+
+    @classmethod
+    def from_parquet(cls, path: str) -> 'DigitalTwinAnalyzer':
+        """Build an analyzer straight from a Parquet telemetry file.
+
+        Reads only the columns the analysis actually uses, skipping the
+        JSON -> dict -> DataFrame path entirely.
+        """
+        inverse = {short: flat for flat, short in cls.COLUMN_RENAMES.items()}
+        columns = ['timestamp', 'simulation_time'] + [
+            inverse.get(col, col) for col in cls.ANALYSIS_COLUMNS
+        ]
+        df = pd.read_parquet(path, columns=columns)
+        df.rename(columns=cls.COLUMN_RENAMES, inplace=True)
+
+        analyzer = cls([], streaming_metrics=cls._load_metrics_sidecar(path))
+        analyzer.df = cls._optimize_dtypes(df)
+        return analyzer
+
     def _convert_to_dataframe(self) -> pd.DataFrame:
         """Convert telemetry log to pandas DataFrame"""
-        data = []
-        for entry in self.telemetry_log:
-            row = {
-                'timestamp': entry.get('timestamp', ''),
-                'simulation_time': entry.get('simulation_time', 0),
-                'speed_kmh': entry['vehicle']['speed_kmh'],
-                'position_km': entry['vehicle']['position_km'],
-                'acceleration_mps2': entry['vehicle']['acceleration_mps2'],
-                'motor_power_kw': entry['motor']['power_kw'],
-                'motor_torque_nm': entry['motor']['torque_nm'],
-                'motor_rpm': entry['motor']['rpm'],
-                'motor_temp_c': entry['motor']['temperature_c'],
-                'motor_health': entry['motor']['health_score'],
-                'battery_soc': entry['battery']['soc_percent'],
-                'battery_voltage': entry['battery']['voltage'],
-                'battery_current': entry['battery']['current_a'],
-                'battery_temp_c': entry['battery']['temperature_c'],
-                'battery_health': entry['battery']['health_soh']
-            }
-            data.append(row)
-        
-        return pd.DataFrame(data)
+        # json_normalize flattens the nested records into columns in C,
+        # so no Python-level per-row loop is needed.
+        df = pd.json_normalize(self.telemetry_log, sep='_')
+        df.rename(columns=self.COLUMN_RENAMES, inplace=True)
+        return self._optimize_dtypes(df)
+
+    @staticmethod
+    def _optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+        """Downcast columns to bandwidth-friendly dtypes"""
+        # None of these physical quantities need float64 precision;
+        # float32 halves the bytes every scan and plot has to touch.
+        float_cols = df.select_dtypes(include='float64').columns
+        df[float_cols] = df[float_cols].astype(np.float32)
+
+        # ISO timestamp strings repeat heavily at 10 Hz sampling
+        if 'timestamp' in df.columns:
+            df['timestamp'] = df['timestamp'].astype('category')
+
+        return df
     
-    def calculate_performance_metrics(self) -> Dict:
-        """Calculate key performance metrics"""
+    @cached_property
+    def metrics(self) -> Dict:
+        """Key performance metrics, computed once per analyzer"""
         metrics = {
-            'total_distance_km': self.df['position_km'].max(),
-            'max_speed_kmh': self.df['speed_kmh'].max(),
-            'avg_speed_kmh': self.df['speed_kmh'].mean(),
-            'max_acceleration_mps2': self.df['acceleration_mps2'].max(),
-            'total_energy_consumed_kwh': self._calculate_energy_consumed(),
-            'energy_efficiency_km_per_kwh': self._calculate_efficiency(),
-            'max_motor_power_kw': self.df['motor_power_kw'].max(),
-            'avg_motor_power_kw': self.df['motor_power_kw'].mean(),
-            'max_motor_temp_c': self.df['motor_temp_c'].max(),
-            'avg_motor_temp_c': self.df['motor_temp_c'].mean(),
-            'max_battery_temp_c': self.df['battery_temp_c'].max(),
-            'avg_battery_temp_c': self.df['battery_temp_c'].mean(),
-            'final_battery_soc': self.df['battery_soc'].iloc[-1],
-            'battery_health_degradation': 100 - self.df['battery_health'].iloc[-1],
-            'motor_health_degradation': 100 - self.df['motor_health'].iloc[-1]
+            'total_distance_km': self._col_max['position_km'],
+            'max_speed_kmh': self._col_max['speed_kmh'],
+            'avg_speed_kmh': self._col_mean['speed_kmh'],
+            'max_acceleration_mps2': self._col_max['acceleration_mps2'],
+            'total_energy_consumed_kwh': self.energy_consumed,
+            'energy_efficiency_km_per_kwh': self.efficiency,
+            'max_motor_power_kw': self._col_max['motor_power_kw'],
+            'avg_motor_power_kw': self._col_mean['motor_power_kw'],
+            'max_motor_temp_c': self._col_max['motor_temp_c'],
+            'avg_motor_temp_c': self._col_mean['motor_temp_c'],
+            'max_battery_temp_c': self._col_max['battery_temp_c'],
+            'avg_battery_temp_c': self._col_mean['battery_temp_c'],
+            'final_battery_soc': self._col_last['battery_soc'],
+            'battery_health_degradation': 100 - self._col_last['battery_health'],
+            'motor_health_degradation': 100 - self._col_last['motor_health']
         }
         
         return metrics
     
-    def _calculate_energy_consumed(self) -> float:
-        """Calculate total energy consumed"""
-        if len(self.df) < 2:
+    @cached_property
+    def energy_consumed(self) -> float:
+        """Total energy consumed over the log (kWh)"""
+        samples = len(self.telemetry_log) if self.telemetry_log else len(self.df)
+        if samples < 2:
             return 0.0
-        initial_soc = self.df['battery_soc'].iloc[0]
-        final_soc = self.df['battery_soc'].iloc[-1]
+        initial_soc = self._col_first['battery_soc']
+        final_soc = self._col_last['battery_soc']
         
         # Assuming 75 kWh battery capacity
         battery_capacity = 75
         energy_consumed = (initial_soc - final_soc) / 100 * battery_capacity
         return max(0, energy_consumed)
     
-    def _calculate_efficiency(self) -> float:
-        """Calculate energy efficiency"""
-        distance = self.df['position_km'].max()
-        energy = self._calculate_energy_consumed()
+    @cached_property
+    def efficiency(self) -> float:
+        """Energy efficiency over the log (km/kWh)"""
+        distance = self._col_max['position_km']
+        energy = self.energy_consumed
         
         if energy > 0:
             return distance / energy
         return 0.0
     
-    def detect_anomalies(self) -> List[Dict]:
-        """Detect anomalies in the telemetry data"""
+    # Per-column temperature limits, checked as one vector compare:
+    # (column, threshold_c, type, severity, label, recommendation)
+    TEMPERATURE_CHECKS = [
+        ('motor_temp_c', 110.0, 'motor_overheating', 'high',
+         'Motor temperature exceeded 110°C',
+         'Reduce load or check cooling system'),
+        ('battery_temp_c', 50.0, 'battery_overheating', 'medium',
+         'Battery temperature exceeded 50°C',
+         'Activate thermal management system')
+    ]
+
+    @cached_property
+    def anomalies(self) -> List[Dict]:
+        """Anomalies detected in the telemetry data"""
         anomalies = []
         
-        # Check for temperature anomalies
-        if self.df['motor_temp_c'].max() > 110:
-            anomalies.append({
-                'type': 'motor_overheating',
-                'severity': 'high',
-                'description': f"Motor temperature exceeded 110°C (max: {self.df['motor_temp_c'].max():.1f}°C)",
-                'recommendation': 'Reduce load or check cooling system'
-            })
-        
-        if self.df['battery_temp_c'].max() > 50:
-            anomalies.append({
-                'type': 'battery_overheating',
-                'severity': 'medium',
-                'description': f"Battery temperature exceeded 50°C (max: {self.df['battery_temp_c'].max():.1f}°C)",
-                'recommendation': 'Activate thermal management system'
-            })
+        # Check all temperature thresholds in a single vector compare
+        actual = np.array([self._col_max[check[0]]
+                           for check in self.TEMPERATURE_CHECKS])
+        thresholds = np.array([check[1] for check in self.TEMPERATURE_CHECKS])
+        violated = actual > thresholds
+
+        for check, value, hit in zip(self.TEMPERATURE_CHECKS, actual, violated):
+            if hit:
+                _, _, anomaly_type, severity, label, recommendation = check
+                anomalies.append({
+                    'type': anomaly_type,
+                    'severity': severity,
+                    'description': f"{label} (max: {value:.1f}°C)",
+                    'recommendation': recommendation
+                })
         
         # Check for efficiency anomalies
-        efficiency = self._calculate_efficiency()
+        efficiency = self.efficiency
         if efficiency < 4.0:
             anomalies.append({
                 'type': 'low_efficiency',
@@ -124,7 +551,7 @@ class DigitalTwinAnalyzer:
             })
         
         # Check for battery health
-        battery_health = self.df['battery_health'].iloc[-1]
+        battery_health = self._col_last['battery_health']
         if battery_health < 80:
             anomalies.append({
                 'type': 'battery_degradation',
@@ -135,12 +562,13 @@ class DigitalTwinAnalyzer:
         
         return anomalies
     
-    def predict_maintenance(self) -> List[Dict]:
-        """Predict maintenance needs"""
+    @cached_property
+    def maintenance(self) -> List[Dict]:
+        """Predicted maintenance needs"""
         predictions = []
         
         # Motor maintenance prediction
-        motor_health = self.df['motor_health'].iloc[-1]
+        motor_health = self._col_last['motor_health']
         if motor_health < 95:
             remaining_hours = (motor_health - 70) * 100  # Simplified model
             predictions.append({
@@ -152,7 +580,7 @@ class DigitalTwinAnalyzer:
             })
         
         # Battery maintenance prediction
-        battery_health = self.df['battery_health'].iloc[-1]
+        battery_health = self._col_last['battery_health']
         if battery_health < 95:
             remaining_cycles = (battery_health - 70) * 50
             predictions.append({
@@ -164,7 +592,7 @@ class DigitalTwinAnalyzer:
             })
         
         # Temperature-based predictions
-        avg_motor_temp = self.df['motor_temp_c'].mean()
+        avg_motor_temp = self._col_mean['motor_temp_c']
         if avg_motor_temp > 90:
             predictions.append({
                 'component': 'Motor Cooling System',
@@ -179,149 +607,80 @@ class DigitalTwinAnalyzer:
     def generate_visualizations(self, output_dir: str):
         """Generate visualization charts"""
         os.makedirs(output_dir, exist_ok=True)
-        
-        # Create figure with subplots
-        fig = plt.figure(figsize=(16, 12))
-        
-        # 1. Speed over time
-        ax1 = plt.subplot(3, 3, 1)
-        ax1.plot(self.df['simulation_time'], self.df['speed_kmh'], 'b-', linewidth=2)
-        ax1.set_xlabel('Time (s)')
-        ax1.set_ylabel('Speed (km/h)')
-        ax1.set_title('Vehicle Speed Over Time')
-        ax1.grid(True, alpha=0.3)
-        
-        # 2. Battery SOC
-        ax2 = plt.subplot(3, 3, 2)
-        ax2.plot(self.df['simulation_time'], self.df['battery_soc'], 'g-', linewidth=2)
-        ax2.set_xlabel('Time (s)')
-        ax2.set_ylabel('SOC (%)')
-        ax2.set_title('Battery State of Charge')
-        ax2.grid(True, alpha=0.3)
-        
-        # 3. Motor power
-        ax3 = plt.subplot(3, 3, 3)
-        ax3.plot(self.df['simulation_time'], self.df['motor_power_kw'], 'r-', linewidth=2)
-        ax3.set_xlabel('Time (s)')
-        ax3.set_ylabel('Power (kW)')
-        ax3.set_title('Motor Power Output')
-        ax3.grid(True, alpha=0.3)
-        
-        # 4. Motor temperature
-        ax4 = plt.subplot(3, 3, 4)
-        ax4.plot(self.df['simulation_time'], self.df['motor_temp_c'], 'orange', linewidth=2)
-        ax4.axhline(y=100, color='r', linestyle='--', label='Warning threshold')
-        ax4.set_xlabel('Time (s)')
-        ax4.set_ylabel('Temperature (°C)')
-        ax4.set_title('Motor Temperature')
-        ax4.legend()
-        ax4.grid(True, alpha=0.3)
-        
-        # 5. Battery temperature
-        ax5 = plt.subplot(3, 3, 5)
-        ax5.plot(self.df['simulation_time'], self.df['battery_temp_c'], 'purple', linewidth=2)
-        ax5.axhline(y=45, color='r', linestyle='--', label='Warning threshold')
-        ax5.set_xlabel('Time (s)')
-        ax5.set_ylabel('Temperature (°C)')
-        ax5.set_title('Battery Temperature')
-        ax5.legend()
-        ax5.grid(True, alpha=0.3)
-        
-        # 6. Motor torque
-        ax6 = plt.subplot(3, 3, 6)
-        ax6.plot(self.df['simulation_time'], self.df['motor_torque_nm'], 'brown', linewidth=2)
-        ax6.set_xlabel('Time (s)')
-        ax6.set_ylabel('Torque (Nm)')
-        ax6.set_title('Motor Torque')
-        ax6.grid(True, alpha=0.3)
-        
-        # 7. Energy consumption rate
-        ax7 = plt.subplot(3, 3, 7)
-        power_consumption = self.df['motor_power_kw']
-        ax7.plot(self.df['simulation_time'], power_consumption, 'c-', linewidth=2)
-        ax7.set_xlabel('Time (s)')
-        ax7.set_ylabel('Power (kW)')
-        ax7.set_title('Instantaneous Energy Consumption')
-        ax7.grid(True, alpha=0.3)
-        
-        # 8. Battery current
-        ax8 = plt.subplot(3, 3, 8)
-        ax8.plot(self.df['simulation_time'], self.df['battery_current'], 'm-', linewidth=2)
-        ax8.set_xlabel('Time (s)')
-        ax8.set_ylabel('Current (A)')
-        ax8.set_title('Battery Current')
-        ax8.grid(True, alpha=0.3)
-        
-        # 9. Efficiency over distance
-        ax9 = plt.subplot(3, 3, 9)
-        # Calculate rolling efficiency
-        if len(self.df) > 10:
-            window = 10
-            rolling_distance = self.df['position_km'].diff().rolling(window).sum()
-            rolling_energy = self.df['battery_soc'].diff().abs().rolling(window).sum() * 0.75  # 75 kWh capacity
-            rolling_efficiency = rolling_distance / (rolling_energy + 0.001)
-            ax9.plot(self.df['position_km'], rolling_efficiency, 'y-', linewidth=2)
-        ax9.set_xlabel('Distance (km)')
-        ax9.set_ylabel('Efficiency (km/kWh)')
-        ax9.set_title('Energy Efficiency')
-        ax9.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        output_path = os.path.join(output_dir, 'telemetry_analysis.png')
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"Visualizations saved to: {output_path}")
-        
-        # Create separate health dashboard
-        self._create_health_dashboard(output_dir)
-    
-    def _create_health_dashboard(self, output_dir: str):
-        """Create a separate health monitoring dashboard"""
-        fig, axes = plt.subplots(2, 2, figsize=(12, 10))
-        
-        # Motor health
-        axes[0, 0].plot(self.df['simulation_time'], self.df['motor_health'], 'b-', linewidth=2)
-        axes[0, 0].axhline(y=90, color='orange', linestyle='--', label='Service threshold')
-        axes[0, 0].axhline(y=80, color='r', linestyle='--', label='Critical threshold')
-        axes[0, 0].set_xlabel('Time (s)')
-        axes[0, 0].set_ylabel('Health (%)')
-        axes[0, 0].set_title('Motor Health Score')
-        axes[0, 0].legend()
-        axes[0, 0].grid(True, alpha=0.3)
-        
-        # Battery health
-        axes[0, 1].plot(self.df['simulation_time'], self.df['battery_health'], 'g-', linewidth=2)
-        axes[0, 1].axhline(y=90, color='orange', linestyle='--', label='Service threshold')
-        axes[0, 1].axhline(y=80, color='r', linestyle='--', label='Critical threshold')
-        axes[0, 1].set_xlabel('Time (s)')
-        axes[0, 1].set_ylabel('Health (%)')
-        axes[0, 1].set_title('Battery State of Health')
-        axes[0, 1].legend()
-        axes[0, 1].grid(True, alpha=0.3)
-        
-        # Temperature distribution
-        axes[1, 0].hist([self.df['motor_temp_c'], self.df['battery_temp_c']], 
-                       bins=20, label=['Motor', 'Battery'], alpha=0.7)
-        axes[1, 0].set_xlabel('Temperature (°C)')
-        axes[1, 0].set_ylabel('Frequency')
-        axes[1, 0].set_title('Temperature Distribution')
-        axes[1, 0].legend()
-        axes[1, 0].grid(True, alpha=0.3)
-        
-        # Power usage histogram
-        axes[1, 1].hist(self.df['motor_power_kw'], bins=30, color='purple', alpha=0.7)
-        axes[1, 1].set_xlabel('Power (kW)')
-        axes[1, 1].set_ylabel('Frequency')
-        axes[1, 1].set_title('Power Usage Distribution')
-        axes[1, 1].grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        output_path = os.path.join(output_dir, 'health_dashboard.png')
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"Health dashboard saved to: {output_path}")
+
+        # The two dashboards are independent rasterizations; render them
+        # in separate processes so each gets its own core (and its own
+        # matplotlib state). Fall back to serial rendering if the pool
+        # or the Parquet handoff is unavailable.
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                tmp_path = os.path.join(tmpdir, 'telemetry.parquet')
+                self.df.to_parquet(tmp_path)
+                with ProcessPoolExecutor(max_workers=2) as pool:
+                    futures = [
+                        pool.submit(_render_from_parquet, tmp_path,
+                                    output_dir, renderer)
+                        for renderer in (_render_telemetry_charts,
+                                         _render_health_dashboard)
+                    ]
+                    for future in futures:
+                        future.result()
+        except Exception as e:
+            print(f"Parallel rendering unavailable ({e}), rendering serially")
+            _render_telemetry_charts(self.df, output_dir)
+            _render_health_dashboard(self.df, output_dir)
+
+_REPORT_TEMPLATE = """\
+{rule}
+SIEMENS AUTOMOBILE DIGITAL TWIN - ANALYSIS REPORT
+{rule}
+Generated: {generated}
+
+EXECUTIVE SUMMARY
+{subrule}
+Total Distance Traveled: {total_distance_km:.2f} km
+Energy Consumed: {total_energy_consumed_kwh:.2f} kWh
+Energy Efficiency: {energy_efficiency_km_per_kwh:.2f} km/kWh
+Final Battery SOC: {final_battery_soc:.1f}%
+
+PERFORMANCE METRICS
+{subrule}
+Maximum Speed: {max_speed_kmh:.1f} km/h
+Average Speed: {avg_speed_kmh:.1f} km/h
+Maximum Acceleration: {max_acceleration_mps2:.2f} m/s²
+Maximum Motor Power: {max_motor_power_kw:.1f} kW
+Average Motor Power: {avg_motor_power_kw:.1f} kW
+
+THERMAL MANAGEMENT
+{subrule}
+Motor - Max Temperature: {max_motor_temp_c:.1f}°C
+Motor - Avg Temperature: {avg_motor_temp_c:.1f}°C
+Battery - Max Temperature: {max_battery_temp_c:.1f}°C
+Battery - Avg Temperature: {avg_battery_temp_c:.1f}°C
+
+COMPONENT HEALTH
+{subrule}
+Motor Health: {motor_health:.2f}% (Degradation: {motor_health_degradation:.3f}%)
+Battery Health: {battery_health:.2f}% (Degradation: {battery_health_degradation:.3f}%)
+
+ANOMALY DETECTION
+{subrule}
+{anomaly_section}
+
+PREDICTIVE MAINTENANCE
+{subrule}
+{maintenance_section}
+
+RECOMMENDATIONS
+{subrule}
+1. Continue monitoring motor temperature during high-load operations
+2. Maintain battery SOC between 20-80% for optimal longevity
+3. Schedule regular calibration of sensor systems
+4. Review energy efficiency trends for optimization opportunities
+
+{rule}
+END OF REPORT
+{rule}"""
 
 
 class ReportGenerator:
@@ -332,128 +691,83 @@ class ReportGenerator:
         
     def generate_text_report(self, output_file: str):
         """Generate a comprehensive text report"""
-        metrics = self.analyzer.calculate_performance_metrics()
-        anomalies = self.analyzer.detect_anomalies()
-        maintenance = self.analyzer.predict_maintenance()
-        
-        report = []
-        report.append("=" * 80)
-        report.append("SIEMENS AUTOMOBILE DIGITAL TWIN - ANALYSIS REPORT")
-        report.append("=" * 80)
-        report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append("")
-        
-        # Executive Summary
-        report.append("EXECUTIVE SUMMARY")
-        report.append("-" * 80)
-        report.append(f"Total Distance Traveled: {metrics['total_distance_km']:.2f} km")
-        report.append(f"Energy Consumed: {metrics['total_energy_consumed_kwh']:.2f} kWh")
-        report.append(f"Energy Efficiency: {metrics['energy_efficiency_km_per_kwh']:.2f} km/kWh")
-        report.append(f"Final Battery SOC: {metrics['final_battery_soc']:.1f}%")
-        report.append("")
-        
-        # Performance Metrics
-        report.append("PERFORMANCE METRICS")
-        report.append("-" * 80)
-        report.append(f"Maximum Speed: {metrics['max_speed_kmh']:.1f} km/h")
-        report.append(f"Average Speed: {metrics['avg_speed_kmh']:.1f} km/h")
-        report.append(f"Maximum Acceleration: {metrics['max_acceleration_mps2']:.2f} m/s²")
-        report.append(f"Maximum Motor Power: {metrics['max_motor_power_kw']:.1f} kW")
-        report.append(f"Average Motor Power: {metrics['avg_motor_power_kw']:.1f} kW")
-        report.append("")
-        
-        # Thermal Management
-        report.append("THERMAL MANAGEMENT")
-        report.append("-" * 80)
-        report.append(f"Motor - Max Temperature: {metrics['max_motor_temp_c']:.1f}°C")
-        report.append(f"Motor - Avg Temperature: {metrics['avg_motor_temp_c']:.1f}°C")
-        report.append(f"Battery - Max Temperature: {metrics['max_battery_temp_c']:.1f}°C")
-        report.append(f"Battery - Avg Temperature: {metrics['avg_battery_temp_c']:.1f}°C")
-        report.append("")
-        
-        # Health Status
-        report.append("COMPONENT HEALTH")
-        report.append("-" * 80)
-        motor_health = 100 - metrics['motor_health_degradation']
-        battery_health = 100 - metrics['battery_health_degradation']
-        report.append(f"Motor Health: {motor_health:.2f}% "
-                     f"(Degradation: {metrics['motor_health_degradation']:.3f}%)")
-        report.append(f"Battery Health: {battery_health:.2f}% "
-                     f"(Degradation: {metrics['battery_health_degradation']:.3f}%)")
-        report.append("")
-        
-        # Anomalies
-        report.append("ANOMALY DETECTION")
-        report.append("-" * 80)
+        metrics = self.analyzer.metrics
+        anomalies = self.analyzer.anomalies
+        maintenance = self.analyzer.maintenance
+
+        # Pre-render the variable-length sections, then fill the template
+        # in one format_map call instead of ~60 list appends + join
         if anomalies:
-            for i, anomaly in enumerate(anomalies, 1):
-                report.append(f"{i}. [{anomaly['severity'].upper()}] {anomaly['type']}")
-                report.append(f"   Description: {anomaly['description']}")
-                report.append(f"   Recommendation: {anomaly['recommendation']}")
-                report.append("")
+            anomaly_section = '\n\n'.join(
+                f"{i}. [{anomaly['severity'].upper()}] {anomaly['type']}\n"
+                f"   Description: {anomaly['description']}\n"
+                f"   Recommendation: {anomaly['recommendation']}"
+                for i, anomaly in enumerate(anomalies, 1)
+            )
         else:
-            report.append("No anomalies detected. All systems operating normally.")
-            report.append("")
-        
-        # Predictive Maintenance
-        report.append("PREDICTIVE MAINTENANCE")
-        report.append("-" * 80)
+            anomaly_section = "No anomalies detected. All systems operating normally."
+
         if maintenance:
+            entries = []
             for i, pred in enumerate(maintenance, 1):
-                report.append(f"{i}. Component: {pred['component']}")
-                report.append(f"   Current Health: {pred['current_health']}")
-                report.append(f"   Maintenance Type: {pred['maintenance_type']}")
-                report.append(f"   Priority: {pred['priority'].upper()}")
+                lines = [
+                    f"{i}. Component: {pred['component']}",
+                    f"   Current Health: {pred['current_health']}",
+                    f"   Maintenance Type: {pred['maintenance_type']}",
+                    f"   Priority: {pred['priority'].upper()}"
+                ]
                 if 'estimated_hours_to_maintenance' in pred:
-                    report.append(f"   Estimated Time: {pred['estimated_hours_to_maintenance']:.0f} hours")
+                    lines.append(f"   Estimated Time: "
+                                 f"{pred['estimated_hours_to_maintenance']:.0f} hours")
                 elif 'estimated_cycles_to_maintenance' in pred:
-                    report.append(f"   Estimated Cycles: {pred['estimated_cycles_to_maintenance']:.0f}")
-                report.append("")
+                    lines.append(f"   Estimated Cycles: "
+                                 f"{pred['estimated_cycles_to_maintenance']:.0f}")
+                entries.append('\n'.join(lines))
+            maintenance_section = '\n\n'.join(entries)
         else:
-            report.append("No maintenance required at this time.")
-            report.append("")
-        
-        # Recommendations
-        report.append("RECOMMENDATIONS")
-        report.append("-" * 80)
-        report.append("1. Continue monitoring motor temperature during high-load operations")
-        report.append("2. Maintain battery SOC between 20-80% for optimal longevity")
-        report.append("3. Schedule regular calibration of sensor systems")
-        report.append("4. Review energy efficiency trends for optimization opportunities")
-        report.append("")
-        
-        report.append("=" * 80)
-        report.append("END OF REPORT")
-        report.append("=" * 80)
-        
+            maintenance_section = "No maintenance required at this time."
+
+        values = dict(metrics)
+        values.update(
+            rule='=' * 80,
+            subrule='-' * 80,
+            generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            motor_health=100 - metrics['motor_health_degradation'],
+            battery_health=100 - metrics['battery_health_degradation'],
+            anomaly_section=anomaly_section,
+            maintenance_section=maintenance_section
+        )
+
+        report = _REPORT_TEMPLATE.format_map(values)
+
         # Write to file
         with open(output_file, 'w') as f:
-            f.write('\n'.join(report))
+            f.write(report)
         
         print(f"Text report generated: {output_file}")
         
-        return '\n'.join(report)
+        return report
 
 
 def main():
     """Generate comprehensive analysis report"""
-    # Load telemetry data
-    telemetry_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-                                 'data', 'telemetry_urban.json')
+    # Load telemetry data, preferring the columnar Parquet export
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
+                            'data')
+    parquet_path = os.path.join(data_dir, 'telemetry_urban.parquet')
+    json_path = os.path.join(data_dir, 'telemetry_urban.json')
     
-    if not os.path.exists(telemetry_path):
+    if os.path.exists(parquet_path):
+        analyzer = DigitalTwinAnalyzer.from_parquet(parquet_path)
+        print(f"Loaded {len(analyzer.df)} telemetry records from Parquet")
+    elif os.path.exists(json_path):
+        analyzer = DigitalTwinAnalyzer.from_json_path(json_path)
+        print(f"Loaded {len(analyzer.df)} telemetry records")
+    else:
         print("Error: No telemetry data found. Please run the simulation first.")
         print("Run: python src/simulation/engine.py")
         return
     
-    with open(telemetry_path, 'r') as f:
-        telemetry_log = json.load(f)
-    
-    print(f"Loaded {len(telemetry_log)} telemetry records")
-    
-    # Create analyzer
-    analyzer = DigitalTwinAnalyzer(telemetry_log)
-    
     # Generate visualizations
     reports_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
                               'reports')
@@ -3,19 +3,21 @@ Initialize digital_twin package
 """
 
 from .core import (
-    Sensor,
+    SensorArray,
     ElectricMotor,
     BatteryPack,
     VehicleDynamics,
-    DigitalTwin
+    DigitalTwin,
+    StreamingMetrics
 )
 
 __all__ = [
-    'Sensor',
-    'ElectricMotor', 
+    'SensorArray',
+    'ElectricMotor',
     'BatteryPack',
     'VehicleDynamics',
-    'DigitalTwin'
+    'DigitalTwin',
+    'StreamingMetrics'
 ]
 
 __version__ = '1.0.0'
@@ -0,0 +1,38 @@
+"""
+Configuration Loading
+Cached YAML config access for the digital twin tooling.
+"""
+
+import os
+import pickle
+
+import yaml
+
+
+def load_config(path: str) -> dict:
+    """Load a YAML config through a pickle sidecar cache.
+
+    yaml.safe_load's pure-Python parser is one of the slower parts of
+    CLI startup; a .pkl sidecar keyed on the YAML file's mtime loads an
+    order of magnitude faster on repeat runs. When the sidecar is stale
+    the YAML is re-parsed with the libyaml C loader if available.
+    """
+    sidecar = path + '.pkl'
+    try:
+        if os.path.getmtime(sidecar) >= os.path.getmtime(path):
+            with open(sidecar, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(path, 'r') as f:
+        config = yaml.load(f, Loader=loader)
+
+    try:
+        with open(sidecar, 'wb') as f:
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # cache is best-effort; a read-only config dir is fine
+
+    return config
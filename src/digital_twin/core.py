@@ -3,45 +3,292 @@ Digital Twin Core Module
 Defines the main components and sensors for the Siemens automobile digital twin.
 """
 
+import math
+
 import numpy as np
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from typing import Dict, List, Optional
 import json
 
+try:
+    import orjson  # Rust JSON encoder; ~10x faster than stdlib json
+except ImportError:
+    orjson = None
 
-class Sensor:
-    """Base class for all sensor types"""
-    
-    def __init__(self, sensor_id: str, sensor_type: str, location: str, unit: str):
-        self.sensor_id = sensor_id
-        self.sensor_type = sensor_type
-        self.location = location
-        self.unit = unit
-        self.value = 0.0
-        self.timestamp = datetime.now()
-        self.status = "active"
-        self.calibration_factor = 1.0
-        
-    def read(self) -> float:
-        """Read sensor value with noise simulation"""
-        noise = np.random.normal(0, 0.02 * abs(self.value))
-        return self.value * self.calibration_factor + noise
-    
-    def update(self, value: float):
-        """Update sensor value"""
-        self.value = value
-        self.timestamp = datetime.now()
-        
-    def to_dict(self) -> Dict:
-        return {
-            "sensor_id": self.sensor_id,
-            "type": self.sensor_type,
-            "location": self.location,
-            "value": self.value,
-            "unit": self.unit,
-            "timestamp": self.timestamp.isoformat(),
-            "status": self.status
-        }
+from ._kernels import (
+    step_kernel, run_kernel, STATE_SIZE,
+    VELOCITY, POSITION, ACCELERATION, MOTOR_RPM, MOTOR_TORQUE, MOTOR_POWER,
+    MOTOR_TEMP, MOTOR_HEALTH, BATT_CHARGE, BATT_VOLTAGE, BATT_CURRENT,
+    BATT_TEMP,
+)
+
+
+@dataclass
+class StreamingMetrics:
+    """Running reductions over telemetry, updated one tick at a time.
+
+    Maintaining max/mean/first/last incrementally during the simulation
+    means downstream analysis can read summary metrics in O(1) without
+    re-scanning (or even materializing) the full telemetry log.
+    """
+    count: int = 0
+    max_speed_kmh: float = float('-inf')
+    sum_speed_kmh: float = 0.0
+    last_position_km: float = 0.0
+    max_acceleration_mps2: float = float('-inf')
+    max_motor_power_kw: float = float('-inf')
+    sum_motor_power_kw: float = 0.0
+    max_motor_temp_c: float = float('-inf')
+    sum_motor_temp_c: float = 0.0
+    max_battery_temp_c: float = float('-inf')
+    sum_battery_temp_c: float = 0.0
+    first_battery_soc: float = 0.0
+    last_battery_soc: float = 0.0
+    last_battery_health: float = 100.0
+    last_motor_health: float = 100.0
+
+    def update(self, entry: Dict):
+        """Fold one telemetry entry into the running reductions"""
+        vehicle = entry['vehicle']
+        motor = entry['motor']
+        battery = entry['battery']
+        self.update_values(
+            speed_kmh=vehicle['speed_kmh'],
+            position_km=vehicle['position_km'],
+            acceleration_mps2=vehicle['acceleration_mps2'],
+            power_kw=motor['power_kw'],
+            motor_temp_c=motor['temperature_c'],
+            motor_health=motor['health_score'],
+            battery_temp_c=battery['temperature_c'],
+            soc_percent=battery['soc_percent'],
+            battery_health=battery['health_soh'],
+        )
+
+    def update_values(self, speed_kmh: float, position_km: float,
+                      acceleration_mps2: float, power_kw: float,
+                      motor_temp_c: float, motor_health: float,
+                      battery_temp_c: float, soc_percent: float,
+                      battery_health: float):
+        """Fold one tick of scalar readings into the running reductions"""
+        if self.count == 0:
+            self.first_battery_soc = soc_percent
+        self.count += 1
+
+        self.max_speed_kmh = max(self.max_speed_kmh, speed_kmh)
+        self.sum_speed_kmh += speed_kmh
+        self.last_position_km = position_km
+        self.max_acceleration_mps2 = max(self.max_acceleration_mps2,
+                                         acceleration_mps2)
+
+        self.max_motor_power_kw = max(self.max_motor_power_kw, power_kw)
+        self.sum_motor_power_kw += power_kw
+        self.max_motor_temp_c = max(self.max_motor_temp_c, motor_temp_c)
+        self.sum_motor_temp_c += motor_temp_c
+        self.last_motor_health = motor_health
+
+        self.max_battery_temp_c = max(self.max_battery_temp_c, battery_temp_c)
+        self.sum_battery_temp_c += battery_temp_c
+        self.last_battery_soc = soc_percent
+        self.last_battery_health = battery_health
+
+    def export(self, filename: str):
+        """Persist the accumulated reductions as a small JSON sidecar"""
+        with open(filename, 'w') as f:
+            json.dump(asdict(self), f)
+
+    @classmethod
+    def from_json(cls, filename: str) -> 'StreamingMetrics':
+        """Rehydrate metrics exported by export()"""
+        with open(filename, 'r') as f:
+            return cls(**json.load(f))
+
+    @property
+    def avg_speed_kmh(self) -> float:
+        return self.sum_speed_kmh / self.count if self.count else 0.0
+
+    @property
+    def avg_motor_power_kw(self) -> float:
+        return self.sum_motor_power_kw / self.count if self.count else 0.0
+
+    @property
+    def avg_motor_temp_c(self) -> float:
+        return self.sum_motor_temp_c / self.count if self.count else 0.0
+
+    @property
+    def avg_battery_temp_c(self) -> float:
+        return self.sum_battery_temp_c / self.count if self.count else 0.0
+
+
+class NoisePool:
+    """Pre-generated Gaussian noise, consumed in slices.
+
+    Drawing samples one at a time through np.random.normal dominates
+    sensor-update cost; pooling one large standard_normal draw and
+    handing out slices amortizes the RNG overhead across thousands of
+    sensor reads. Callers scale the unit-variance samples themselves.
+    """
+
+    def __init__(self, size: int = 65536):
+        self._rng = np.random.default_rng()
+        self._pool = self._rng.standard_normal(size)
+        self._cursor = 0
+
+    def take(self, n: int) -> np.ndarray:
+        """Return the next n unit-normal samples, refilling as needed"""
+        if self._cursor + n > self._pool.shape[0]:
+            self._pool = self._rng.standard_normal(self._pool.shape[0])
+            self._cursor = 0
+        samples = self._pool[self._cursor:self._cursor + n]
+        self._cursor += n
+        return samples
+
+
+_noise = NoisePool()
+
+# Angular conversion constants, folded once at import time
+_RAD_PER_RPM = math.pi / 30.0
+_RPM_PER_RAD = 30.0 / math.pi
+
+
+class TelemetryBuffer:
+    """Preallocated columnar telemetry storage.
+
+    Logging a nested dict per step churns the allocator and forces the
+    exporters to re-flatten everything afterwards. This buffer instead
+    writes one float row into a preallocated (columns, capacity) array,
+    growing geometrically, and exposes columns as zero-copy views;
+    the historical list-of-dicts shape is materialized only on demand.
+    """
+
+    COLUMNS = (
+        'timestamp', 'simulation_time',
+        'motor_power_kw', 'motor_torque_nm', 'motor_rpm',
+        'motor_temperature_c', 'motor_efficiency', 'motor_health_score',
+        'battery_soc_percent', 'battery_charge_kwh', 'battery_voltage',
+        'battery_current_a', 'battery_temperature_c', 'battery_health_soh',
+        'battery_cycle_count',
+        'vehicle_speed_kmh', 'vehicle_acceleration_mps2',
+        'vehicle_position_km', 'vehicle_brake_force_n',
+    )
+
+    def __init__(self, capacity: int = 1024):
+        self._data = np.zeros((len(self.COLUMNS), capacity))
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, row: tuple):
+        """Append one row of floats, in COLUMNS order"""
+        if self._size == self._data.shape[1]:
+            grown = np.zeros((len(self.COLUMNS), self._data.shape[1] * 2))
+            grown[:, :self._size] = self._data
+            self._data = grown
+        self._data[:, self._size] = row
+        self._size += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one telemetry column"""
+        return self._data[self.COLUMNS.index(name), :self._size]
+
+    def to_dataframe(self):
+        """Build a flat DataFrame straight from the column arrays"""
+        import pandas as pd
+        return pd.DataFrame({name: self._data[i, :self._size].copy()
+                             for i, name in enumerate(self.COLUMNS)})
+
+    def to_records(self) -> List[Dict]:
+        """Materialize the nested per-entry dict shape on demand"""
+        records = []
+        for j in range(self._size):
+            values = dict(zip(self.COLUMNS, self._data[:, j]))
+            records.append({
+                "timestamp": values['timestamp'],
+                "simulation_time": round(values['simulation_time'], 2),
+                "motor": {
+                    "power_kw": round(values['motor_power_kw'], 2),
+                    "torque_nm": round(values['motor_torque_nm'], 2),
+                    "rpm": round(values['motor_rpm'], 2),
+                    "temperature_c": round(values['motor_temperature_c'], 2),
+                    "efficiency": values['motor_efficiency'],
+                    "health_score": round(values['motor_health_score'], 2),
+                },
+                "battery": {
+                    "soc_percent": round(values['battery_soc_percent'], 2),
+                    "charge_kwh": round(values['battery_charge_kwh'], 2),
+                    "voltage": round(values['battery_voltage'], 2),
+                    "current_a": round(values['battery_current_a'], 2),
+                    "temperature_c": round(values['battery_temperature_c'], 2),
+                    "health_soh": round(values['battery_health_soh'], 2),
+                    "cycle_count": int(values['battery_cycle_count']),
+                },
+                "vehicle": {
+                    "speed_kmh": round(values['vehicle_speed_kmh'], 2),
+                    "acceleration_mps2": round(values['vehicle_acceleration_mps2'], 2),
+                    "position_km": round(values['vehicle_position_km'], 2),
+                    "brake_force_n": round(values['vehicle_brake_force_n'], 2),
+                },
+            })
+        return records
+
+
+SENSOR_DTYPE = np.dtype([
+    ('value', 'f8'),
+    ('timestamp', 'f8'),    # simulation time (s) of the last update
+    ('calibration', 'f8'),
+    ('status', 'u1'),       # 1 = active
+])
+
+
+class SensorArray:
+    """A subsystem's sensors as one structured NumPy record array.
+
+    Each sensor used to be a six-attribute Python object with its own
+    __dict__, so a subsystem update meant pointer chasing and attribute
+    dispatch per sensor. The numeric fields now live contiguously in a
+    structured array and update with two vectorized stores; the static
+    metadata (ids, types, locations, units) stays in plain tuples.
+    """
+
+    def __init__(self, sensor_ids, sensor_types, locations, units):
+        self.sensor_ids = tuple(sensor_ids)
+        self.sensor_types = tuple(sensor_types)
+        self.locations = tuple(locations)
+        self.units = tuple(units)
+        self.records = np.zeros(len(self.sensor_ids), dtype=SENSOR_DTYPE)
+        self.records['calibration'] = 1.0
+        self.records['status'] = 1
+
+    def __len__(self) -> int:
+        return self.records.shape[0]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.records['value']
+
+    def update(self, values, sim_time: float = 0.0):
+        """Vectorized update of all sensor values"""
+        self.records['value'] = values
+        self.records['timestamp'] = sim_time
+
+    def read(self) -> np.ndarray:
+        """Read all sensor values with noise simulation"""
+        values = self.records['value']
+        noise = _noise.take(values.shape[0]) * 0.02 * np.abs(values)
+        return values * self.records['calibration'] + noise
+
+    def to_dicts(self) -> List[Dict]:
+        """Materialize per-sensor dicts (export/debug path only)"""
+        return [
+            {"sensor_id": sensor_id, "type": sensor_type,
+             "location": location, "value": float(record['value']),
+             "unit": unit, "timestamp": float(record['timestamp']),
+             "status": "active" if record['status'] else "inactive"}
+            for sensor_id, sensor_type, location, unit, record in zip(
+                self.sensor_ids, self.sensor_types, self.locations,
+                self.units, self.records)
+        ]
 
 
 class ElectricMotor:
@@ -59,9 +306,12 @@ class ElectricMotor:
         self.health_score = 100.0
         
         # Sensors
-        self.temp_sensor = Sensor("motor_temp", "temperature", "motor_housing", "°C")
-        self.torque_sensor = Sensor("motor_torque", "torque", "motor_shaft", "Nm")
-        self.rpm_sensor = Sensor("motor_rpm", "speed", "motor_shaft", "RPM")
+        self.sensors = SensorArray(
+            ("motor_temp", "motor_torque", "motor_rpm"),
+            ("temperature", "torque", "speed"),
+            ("motor_housing", "motor_shaft", "motor_shaft"),
+            ("°C", "Nm", "RPM"),
+        )
         
     def apply_load(self, requested_torque: float, rpm: float):
         """Apply load to motor and calculate performance"""
@@ -70,7 +320,7 @@ class ElectricMotor:
         self.current_rpm = rpm
         
         # Calculate power output (P = T * ω / 1000)
-        omega = rpm * 2 * np.pi / 60  # Convert RPM to rad/s
+        omega = rpm * _RAD_PER_RPM  # Convert RPM to rad/s
         self.current_power_kw = (self.current_torque_nm * omega / 1000) * self.efficiency
         self.current_power_kw = min(self.current_power_kw, self.max_power_kw)
         
@@ -83,9 +333,8 @@ class ElectricMotor:
         self.temperature_c -= cooling_rate
         
         # Update sensors
-        self.temp_sensor.update(self.temperature_c)
-        self.torque_sensor.update(self.current_torque_nm)
-        self.rpm_sensor.update(self.current_rpm)
+        self.sensors.update((self.temperature_c, self.current_torque_nm,
+                             self.current_rpm))
         
         # Health degradation
         if self.temperature_c > 120:
@@ -93,18 +342,26 @@ class ElectricMotor:
             
     def get_status(self) -> Dict:
         return {
-            "power_kw": round(self.current_power_kw, 2),
-            "torque_nm": round(self.current_torque_nm, 2),
-            "rpm": round(self.current_rpm, 2),
-            "temperature_c": round(self.temperature_c, 2),
+            "power_kw": self.current_power_kw,
+            "torque_nm": self.current_torque_nm,
+            "rpm": self.current_rpm,
+            "temperature_c": self.temperature_c,
             "efficiency": self.efficiency,
-            "health_score": round(self.health_score, 2)
+            "health_score": self.health_score
         }
 
 
 class BatteryPack:
     """Battery management system model"""
-    
+
+    # Static sensor metadata, shared across instances. The per-sample
+    # readings live in plain numpy arrays (structure-of-arrays) rather
+    # than lists of Sensor objects; dicts are materialized on demand.
+    NUM_CELL_SENSORS = 10
+    NUM_TEMP_SENSORS = 4
+    CELL_SENSOR_IDS = tuple(f"cell_{i}_voltage" for i in range(NUM_CELL_SENSORS))
+    TEMP_SENSOR_IDS = tuple(f"battery_temp_{i}" for i in range(NUM_TEMP_SENSORS))
+
     def __init__(self, capacity_kwh: float = 75, nominal_voltage: float = 400):
         self.capacity_kwh = capacity_kwh
         self.nominal_voltage = nominal_voltage
@@ -117,11 +374,9 @@ class BatteryPack:
         self.cells_series = 96
         self.cells_parallel = 4
         
-        # Cell voltage sensors (sample some cells)
-        self.cell_voltages = [Sensor(f"cell_{i}_voltage", "voltage", f"cell_{i}", "V") 
-                             for i in range(10)]
-        self.temp_sensors = [Sensor(f"battery_temp_{i}", "temperature", f"pack_{i}", "°C") 
-                            for i in range(4)]
+        # Sampled cell voltages and pack temperatures (see class docs)
+        self.cell_voltage_values = np.zeros(self.NUM_CELL_SENSORS)
+        self.pack_temp_values = np.full(self.NUM_TEMP_SENSORS, 25.0)
         
     def discharge(self, power_kw: float, time_step_hours: float):
         """Discharge battery"""
@@ -138,14 +393,12 @@ class BatteryPack:
         self.temperature_c += heat
         self.temperature_c -= (self.temperature_c - 25) * 0.1  # Cooling
         
-        # Update sensors
-        for i, sensor in enumerate(self.cell_voltages):
-            cell_voltage = self.current_voltage / self.cells_series
-            sensor.update(cell_voltage + np.random.normal(0, 0.01))
-            
-        avg_temp = self.temperature_c
-        for sensor in self.temp_sensors:
-            sensor.update(avg_temp + np.random.normal(0, 2))
+        # Update sensor readings (vectorized over all sampled cells)
+        cell_voltage = self.current_voltage / self.cells_series
+        self.cell_voltage_values = (cell_voltage +
+                                    _noise.take(self.NUM_CELL_SENSORS) * 0.01)
+        self.pack_temp_values = (self.temperature_c +
+                                 _noise.take(self.NUM_TEMP_SENSORS) * 2)
         
     def charge(self, power_kw: float, time_step_hours: float):
         """Charge battery"""
@@ -167,15 +420,36 @@ class BatteryPack:
     def efficiency_charge(self) -> float:
         """Calculate charge efficiency"""
         return 0.92
-    
+
+    def sensor_readings(self) -> List[Dict]:
+        """Materialize sensor dicts from the reading arrays.
+
+        Only called at export time; the hot path touches the arrays.
+        """
+        readings = [
+            {"sensor_id": sensor_id, "type": "voltage",
+             "location": f"cell_{i}", "value": float(value), "unit": "V",
+             "status": "active"}
+            for i, (sensor_id, value) in enumerate(
+                zip(self.CELL_SENSOR_IDS, self.cell_voltage_values))
+        ]
+        readings += [
+            {"sensor_id": sensor_id, "type": "temperature",
+             "location": f"pack_{i}", "value": float(value), "unit": "°C",
+             "status": "active"}
+            for i, (sensor_id, value) in enumerate(
+                zip(self.TEMP_SENSOR_IDS, self.pack_temp_values))
+        ]
+        return readings
+
     def get_status(self) -> Dict:
         return {
-            "soc_percent": round(self.get_soc() * 100, 2),
-            "charge_kwh": round(self.current_charge_kwh, 2),
-            "voltage": round(self.current_voltage, 2),
-            "current_a": round(self.current_amperage, 2),
-            "temperature_c": round(self.temperature_c, 2),
-            "health_soh": round(self.health_soh, 2),
+            "soc_percent": self.get_soc() * 100,
+            "charge_kwh": self.current_charge_kwh,
+            "voltage": self.current_voltage,
+            "current_a": self.current_amperage,
+            "temperature_c": self.temperature_c,
+            "health_soh": self.health_soh,
             "cycle_count": self.cycle_count
         }
 
@@ -192,11 +466,19 @@ class VehicleDynamics:
         self.frontal_area_m2 = 2.3
         self.rolling_resistance = 0.015
         self.brake_force_n = 0
-        
+
+        # Per-step constants, folded once (0.5 * rho * Cd * A, etc.)
+        self._drag_k = 0.5 * 1.225 * self.drag_coefficient * self.frontal_area_m2
+        self._rolling_force_n = self.rolling_resistance * self.mass_kg * 9.81
+        self._max_brake_force_n = self.mass_kg * 9.81 * 0.8
+
         # Sensors
-        self.speed_sensor = Sensor("vehicle_speed", "speed", "wheel", "km/h")
-        self.accel_sensor = Sensor("acceleration", "acceleration", "chassis", "m/s²")
-        self.position_sensor = Sensor("gps_position", "position", "roof", "m")
+        self.sensors = SensorArray(
+            ("vehicle_speed", "acceleration", "gps_position"),
+            ("speed", "acceleration", "position"),
+            ("wheel", "chassis", "roof"),
+            ("km/h", "m/s²", "m"),
+        )
         
     def update(self, motor_torque_nm: float, time_step_s: float, gear_ratio: float = 10.0):
         """Update vehicle dynamics"""
@@ -205,12 +487,11 @@ class VehicleDynamics:
         drive_force_n = (motor_torque_nm * gear_ratio) / wheel_radius_m
         
         # Air resistance: F_drag = 0.5 * ρ * Cd * A * v²
-        air_density = 1.225
-        drag_force_n = 0.5 * air_density * self.drag_coefficient * self.frontal_area_m2 * (self.velocity_mps ** 2)
-        
+        drag_force_n = self._drag_k * (self.velocity_mps ** 2)
+
         # Rolling resistance: F_roll = Crr * m * g
-        rolling_force_n = self.rolling_resistance * self.mass_kg * 9.81
-        
+        rolling_force_n = self._rolling_force_n
+
         # Net force
         net_force_n = drive_force_n - drag_force_n - rolling_force_n - self.brake_force_n
         
@@ -223,21 +504,19 @@ class VehicleDynamics:
         self.position_m += self.velocity_mps * time_step_s
         
         # Update sensors
-        self.speed_sensor.update(self.velocity_mps * 3.6)  # Convert to km/h
-        self.accel_sensor.update(self.acceleration_mps2)
-        self.position_sensor.update(self.position_m)
+        self.sensors.update((self.velocity_mps * 3.6, self.acceleration_mps2,
+                             self.position_m))
         
     def apply_brakes(self, brake_percentage: float):
         """Apply braking force (0-100%)"""
-        max_brake_force = self.mass_kg * 9.81 * 0.8  # 0.8g max deceleration
-        self.brake_force_n = max_brake_force * (brake_percentage / 100.0)
+        self.brake_force_n = self._max_brake_force_n * (brake_percentage / 100.0)
         
     def get_status(self) -> Dict:
         return {
-            "speed_kmh": round(self.velocity_mps * 3.6, 2),
-            "acceleration_mps2": round(self.acceleration_mps2, 2),
-            "position_km": round(self.position_m / 1000, 2),
-            "brake_force_n": round(self.brake_force_n, 2)
+            "speed_kmh": self.velocity_mps * 3.6,
+            "acceleration_mps2": self.acceleration_mps2,
+            "position_km": self.position_m / 1000,
+            "brake_force_n": self.brake_force_n
         }
 
 
@@ -257,49 +536,233 @@ class DigitalTwin:
         self.dynamics = VehicleDynamics(mass_kg=config['vehicle']['weight_kg'])
         
         self.simulation_time = 0
-        self.telemetry_log = []
-        
-    def step(self, throttle_percent: float, brake_percent: float, time_step_s: float = 0.1):
-        """Execute one simulation step"""
-        # Calculate motor demand
-        max_torque = self.motor.max_torque_nm
-        requested_torque = max_torque * (throttle_percent / 100.0)
-        
-        # Motor speed based on vehicle speed
+        self.run_started = datetime.now()
+        self.telemetry = TelemetryBuffer()
+        self.streaming_metrics = StreamingMetrics()
+
+        # Flat state vector and constant parameters for the compiled
+        # step kernel; the component objects above stay authoritative
+        # for configuration but are only synced back at log time.
+        self._state = np.zeros(STATE_SIZE, dtype=np.float64)
+        self._state[MOTOR_TEMP] = self.motor.temperature_c
+        self._state[MOTOR_HEALTH] = self.motor.health_score
+        self._state[BATT_CHARGE] = self.battery.current_charge_kwh
+        self._state[BATT_VOLTAGE] = self.battery.current_voltage
+        self._state[BATT_TEMP] = self.battery.temperature_c
+        # Fold the model constants once; the kernel then runs without
+        # redundant per-step arithmetic (no divisions, no np.pi lookup).
+        wheel_radius_m = 0.35
         gear_ratio = 10.0
-        wheel_radius = 0.35
-        motor_rpm = (self.dynamics.velocity_mps / wheel_radius) * gear_ratio * (60 / (2 * np.pi))
-        
-        # Update motor
-        self.motor.apply_load(requested_torque, motor_rpm)
-        
-        # Update battery
-        if self.motor.current_power_kw > 0:
-            self.battery.discharge(self.motor.current_power_kw, time_step_s / 3600)
-        
-        # Apply brakes
-        self.dynamics.apply_brakes(brake_percent)
-        
-        # Update vehicle dynamics
-        self.dynamics.update(self.motor.current_torque_nm, time_step_s, gear_ratio)
-        
+        self._params = (
+            float(self.motor.max_power_kw),
+            float(self.motor.max_torque_nm),
+            float(self.motor.max_torque_nm) / 100.0,     # torque per throttle %
+            gear_ratio / wheel_radius_m * _RPM_PER_RAD,  # RPM per m/s
+            gear_ratio / wheel_radius_m,                 # drive force per Nm
+            float(self.dynamics._drag_k),
+            float(self.dynamics._rolling_force_n),
+            float(self.dynamics._max_brake_force_n),
+            1.0 / float(self.dynamics.mass_kg),
+            float(self.battery.nominal_voltage),
+            1.0 / float(self.battery.capacity_kwh),
+            float(self.motor.efficiency),
+        )
+        self._last_brake_percent = 0.0
+
+    def step(self, throttle_percent: float, brake_percent: float, time_step_s: float = 0.1):
+        """Execute one simulation step via the compiled kernel"""
+        step_kernel(self._state, throttle_percent, brake_percent,
+                    time_step_s, self._params)
+        self._last_brake_percent = brake_percent
         self.simulation_time += time_step_s
-        
+
+    def run_profile(self, throttle: np.ndarray, brake: np.ndarray,
+                    time_step_s: float = 0.1, log_interval: int = 10):
+        """Run a whole precomputed control profile in one batch.
+
+        All non-recursive work (control inputs, constants) is already
+        hoisted into arrays, so only the stateful scalar updates remain
+        and they run inside one compiled loop. Logged snapshots are
+        folded into the telemetry buffer afterwards.
+        """
+        throttle = np.ascontiguousarray(throttle, dtype=np.float64)
+        brake = np.ascontiguousarray(brake, dtype=np.float64)
+        steps = throttle.shape[0]
+        snapshots = np.empty((steps // log_interval + 1, STATE_SIZE))
+
+        start_time = self.simulation_time
+        logged = run_kernel(self._state, throttle, brake, time_step_s,
+                            self._params, log_interval, snapshots)
+        for j in range(logged):
+            step_index = (j + 1) * log_interval
+            self._log_state_row(snapshots[j],
+                                start_time + step_index * time_step_s,
+                                brake[step_index - 1])
+
+        self.simulation_time = start_time + steps * time_step_s
+        if steps:
+            self._last_brake_percent = brake[-1]
+
+    def _sync_components(self):
+        """Copy the kernel state back into the component objects.
+
+        Only called when telemetry or status is materialized, so the
+        per-step hot path never touches Python attributes or sensors.
+        """
+        state = self._state
+        motor = self.motor
+        motor.current_rpm = state[MOTOR_RPM]
+        motor.current_torque_nm = state[MOTOR_TORQUE]
+        motor.current_power_kw = state[MOTOR_POWER]
+        motor.temperature_c = state[MOTOR_TEMP]
+        motor.health_score = state[MOTOR_HEALTH]
+        motor.sensors.update((motor.temperature_c, motor.current_torque_nm,
+                              motor.current_rpm), self.simulation_time)
+
+        battery = self.battery
+        battery.current_charge_kwh = state[BATT_CHARGE]
+        battery.current_voltage = state[BATT_VOLTAGE]
+        battery.current_amperage = state[BATT_CURRENT]
+        battery.temperature_c = state[BATT_TEMP]
+        cell_voltage = battery.current_voltage / battery.cells_series
+        battery.cell_voltage_values = (
+            cell_voltage + _noise.take(battery.NUM_CELL_SENSORS) * 0.01)
+        battery.pack_temp_values = (
+            battery.temperature_c + _noise.take(battery.NUM_TEMP_SENSORS) * 2)
+
+        dynamics = self.dynamics
+        dynamics.velocity_mps = state[VELOCITY]
+        dynamics.acceleration_mps2 = state[ACCELERATION]
+        dynamics.position_m = state[POSITION]
+        dynamics.brake_force_n = (dynamics._max_brake_force_n *
+                                  (self._last_brake_percent / 100.0))
+        dynamics.sensors.update((dynamics.velocity_mps * 3.6,
+                                 dynamics.acceleration_mps2,
+                                 dynamics.position_m), self.simulation_time)
+
     def get_telemetry(self) -> Dict:
         """Get current telemetry data"""
+        self._sync_components()
         return {
-            "timestamp": datetime.now().isoformat(),
-            "simulation_time": round(self.simulation_time, 2),
+            # Float simulation time; converted to ISO form at export
+            "timestamp": self.simulation_time,
+            "simulation_time": self.simulation_time,
             "motor": self.motor.get_status(),
             "battery": self.battery.get_status(),
             "vehicle": self.dynamics.get_status()
         }
     
+    def telemetry_snapshot(self) -> Dict:
+        """Telemetry in the get_telemetry() shape, without the sync.
+
+        Streaming loops call this every tick; it reads the state vector
+        directly and skips the component/sensor synchronization (and its
+        noise draws), so the emit path pays only for the dict itself.
+        The literal keys are interned by the interpreter, so no key
+        strings are allocated or rehashed per frame.
+        """
+        state = self._state
+        battery = self.battery
+        return {
+            "timestamp": self.simulation_time,
+            "simulation_time": self.simulation_time,
+            "motor": {
+                "power_kw": float(state[MOTOR_POWER]),
+                "torque_nm": float(state[MOTOR_TORQUE]),
+                "rpm": float(state[MOTOR_RPM]),
+                "temperature_c": float(state[MOTOR_TEMP]),
+                "efficiency": self.motor.efficiency,
+                "health_score": float(state[MOTOR_HEALTH]),
+            },
+            "battery": {
+                "soc_percent": float(state[BATT_CHARGE]) / battery.capacity_kwh * 100,
+                "charge_kwh": float(state[BATT_CHARGE]),
+                "voltage": float(state[BATT_VOLTAGE]),
+                "current_a": float(state[BATT_CURRENT]),
+                "temperature_c": float(state[BATT_TEMP]),
+                "health_soh": battery.health_soh,
+                "cycle_count": battery.cycle_count,
+            },
+            "vehicle": {
+                "speed_kmh": float(state[VELOCITY]) * 3.6,
+                "acceleration_mps2": float(state[ACCELERATION]),
+                "position_km": float(state[POSITION]) / 1000,
+                "brake_force_n": (self.dynamics._max_brake_force_n *
+                                  (self._last_brake_percent / 100.0)),
+            },
+        }
+
+    @property
+    def telemetry_log(self) -> List[Dict]:
+        """Logged telemetry in the historical list-of-dicts shape"""
+        return self.telemetry.to_records()
+
     def log_telemetry(self):
-        """Log telemetry data"""
-        self.telemetry_log.append(self.get_telemetry())
+        """Log telemetry into the columnar buffer"""
+        self._log_state_row(self._state, self.simulation_time,
+                            self._last_brake_percent)
+
+    def _log_state_row(self, state: np.ndarray, sim_time: float,
+                       brake_percent: float):
+        """Fold one state snapshot into the buffer and running metrics"""
+        battery = self.battery
+        speed_kmh = state[VELOCITY] * 3.6
+        position_km = state[POSITION] / 1000.0
+        soc_percent = (state[BATT_CHARGE] / battery.capacity_kwh) * 100
+        brake_force_n = (self.dynamics._max_brake_force_n *
+                         (brake_percent / 100.0))
+        self.telemetry.append((
+            sim_time, sim_time,
+            state[MOTOR_POWER], state[MOTOR_TORQUE], state[MOTOR_RPM],
+            state[MOTOR_TEMP], self.motor.efficiency, state[MOTOR_HEALTH],
+            soc_percent, state[BATT_CHARGE], state[BATT_VOLTAGE],
+            state[BATT_CURRENT], state[BATT_TEMP], battery.health_soh,
+            battery.cycle_count,
+            speed_kmh, state[ACCELERATION], position_km, brake_force_n,
+        ))
+        self.streaming_metrics.update_values(
+            speed_kmh=speed_kmh,
+            position_km=position_km,
+            acceleration_mps2=state[ACCELERATION],
+            power_kw=state[MOTOR_POWER],
+            motor_temp_c=state[MOTOR_TEMP],
+            motor_health=state[MOTOR_HEALTH],
+            battery_temp_c=state[BATT_TEMP],
+            soc_percent=soc_percent,
+            battery_health=battery.health_soh,
+        )
         
     def export_telemetry(self, filename: str):
-        """Export telemetry to JSON file"""
-        with open(filename, 'w') as f:
-            json.dump(self.telemetry_log, f, indent=2)
+        """Export telemetry to JSON or Parquet, based on file extension.
+
+        Parquet stores the log column-chunked and snappy-compressed, so
+        analysis runs can load just the columns they need instead of
+        re-parsing every field of every JSON record.
+        """
+        if filename.endswith('.parquet'):
+            df = self.telemetry.to_dataframe().round(2)
+            if len(df):
+                df['timestamp'] = self._isoformat_timestamps()
+            df.to_parquet(filename, compression='snappy')
+        else:
+            records = self.telemetry.to_records()
+            for record, stamp in zip(records, self._isoformat_timestamps()):
+                record['timestamp'] = stamp
+            if orjson is not None:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+            else:
+                with open(filename, 'w') as f:
+                    json.dump(records, f, indent=2)
+
+    def _isoformat_timestamps(self) -> List[str]:
+        """Convert logged sim times to ISO timestamps in one pass.
+
+        One vectorized to_timedelta/strftime call replaces a
+        datetime.now().isoformat() per logged entry.
+        """
+        import pandas as pd
+        seconds = self.telemetry.column('timestamp')
+        stamps = (pd.Timestamp(self.run_started) +
+                  pd.to_timedelta(seconds, unit='s'))
+        return list(stamps.strftime('%Y-%m-%dT%H:%M:%S.%f'))
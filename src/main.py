@@ -7,24 +7,21 @@ import argparse
 import sys
 import os
 
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
 
 def run_simulation(scenario='urban'):
     """Run a driving simulation"""
-    import yaml
+    from digital_twin.config import load_config
     from digital_twin.core import DigitalTwin
     from simulation.engine import SimulationEngine
-    
+
     print(f"\n{'='*60}")
     print("SIEMENS AUTOMOBILE DIGITAL TWIN - SIMULATION")
     print(f"{'='*60}\n")
-    
+
     # Load configuration
-    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)),
                                'config', 'config.yaml')
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    config = load_config(config_path)
     
     # Create digital twin
     print("Initializing digital twin...")
@@ -41,11 +38,39 @@ def run_simulation(scenario='urban'):
     os.makedirs(data_dir, exist_ok=True)
     output_path = os.path.join(data_dir, f'telemetry_{scenario}.json')
     dt.export_telemetry(output_path)
-    
+
+    # Columnar copy for fast analysis loads (JSON stays for the web viewers)
+    parquet_path = os.path.join(data_dir, f'telemetry_{scenario}.parquet')
+    dt.export_telemetry(parquet_path)
+
+    # Summary reductions accumulated during the run; the report reads
+    # these in O(1) instead of re-scanning the telemetry files
+    metrics_path = os.path.join(data_dir, f'telemetry_{scenario}.metrics.json')
+    dt.streaming_metrics.export(metrics_path)
+
     print(f"\n✓ Simulation complete!")
     print(f"✓ Telemetry data saved to: {output_path}\n")
 
 
+def run_all_scenarios():
+    """Run every driving scenario, one worker process per scenario.
+
+    The scenarios share no state, so they are embarrassingly parallel;
+    each worker builds its own digital twin and exports its own
+    telemetry files.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    scenarios = ['urban', 'highway', 'aggressive', 'eco']
+    try:
+        with ProcessPoolExecutor(max_workers=len(scenarios)) as pool:
+            list(pool.map(run_simulation, scenarios))
+    except Exception as e:
+        print(f"Parallel simulation unavailable ({e}); running serially")
+        for scenario in scenarios:
+            run_simulation(scenario)
+
+
 def generate_report():
     """Generate analysis report"""
     from analysis.generate_report import main as report_main
@@ -95,7 +120,10 @@ def main():
 Examples:
   # Run urban driving simulation
   python src/main.py simulate --scenario urban
-  
+
+  # Run all scenarios in parallel
+  python src/main.py simulate-all
+
   # Generate analysis report
   python src/main.py report
   
@@ -115,7 +143,8 @@ Examples:
     
     parser.add_argument(
         'command',
-        choices=['simulate', 'report', 'visualize', 'dashboard', 'viewer', 'all'],
+        choices=['simulate', 'simulate-all', 'report', 'visualize', 'dashboard',
+                 'viewer', 'all'],
         help='Command to execute'
     )
     
@@ -131,7 +160,10 @@ Examples:
     try:
         if args.command == 'simulate':
             run_simulation(args.scenario)
-            
+
+        elif args.command == 'simulate-all':
+            run_all_scenarios()
+
         elif args.command == 'report':
             generate_report()
             
@@ -8,8 +8,10 @@ from typing import List, Tuple
 import sys
 import os
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __package__ in (None, ''):  # direct script execution only
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from digital_twin.config import load_config
 from digital_twin.core import DigitalTwin
 
 
@@ -24,6 +26,18 @@ class DrivingScenario:
         """Return (throttle_percent, brake_percent) at given time"""
         raise NotImplementedError
 
+    def precompute(self, time_step_s: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (throttle, brake) arrays for every step of the scenario.
+
+        Subclasses override this with vectorized profiles so the engine
+        indexes precomputed arrays instead of calling get_control_inputs
+        once per step; this fallback keeps custom scenarios working.
+        """
+        times = np.arange(int(self.duration_s / time_step_s)) * time_step_s
+        inputs = [self.get_control_inputs(t) for t in times]
+        throttle, brake = zip(*inputs) if inputs else ((), ())
+        return np.asarray(throttle, dtype=np.float64), np.asarray(brake, dtype=np.float64)
+
 
 class UrbanDrivingScenario(DrivingScenario):
     """Urban driving with stop-and-go traffic"""
@@ -48,7 +62,16 @@ class UrbanDrivingScenario(DrivingScenario):
         else:  # Stop
             throttle = 0
             brake = 50
-            
+
+        return throttle, brake
+
+    def precompute(self, time_step_s: float) -> Tuple[np.ndarray, np.ndarray]:
+        times = np.arange(int(self.duration_s / time_step_s)) * time_step_s
+        t = times % 60
+        throttle = np.where(t < 20, np.minimum(40 + t * 2, 60),
+                            np.where(t < 30, 30.0, 0.0))
+        brake = np.where(t < 30, 0.0,
+                         np.where(t < 40, 20 + (t - 30) * 3, 50.0))
         return throttle, brake
 
 
@@ -68,7 +91,16 @@ class HighwayDrivingScenario(DrivingScenario):
         else:  # Cruise at highway speed
             throttle = 45 + np.sin(time * 0.1) * 5  # Minor variations
             brake = 0
-            
+
+        return throttle, brake
+
+    def precompute(self, time_step_s: float) -> Tuple[np.ndarray, np.ndarray]:
+        times = np.arange(int(self.duration_s / time_step_s)) * time_step_s
+        throttle = np.where(times < 60, np.minimum(70 + times, 100),
+                            np.where(times > self.duration_s - 120, 30.0,
+                                     45 + np.sin(times * 0.1) * 5))
+        brake = np.where(times < 60, 0.0,
+                         np.where(times > self.duration_s - 120, 20.0, 0.0))
         return throttle, brake
 
 
@@ -94,7 +126,15 @@ class AggressiveDrivingScenario(DrivingScenario):
         else:  # Stop
             throttle = 0
             brake = 50
-            
+
+        return throttle, brake
+
+    def precompute(self, time_step_s: float) -> Tuple[np.ndarray, np.ndarray]:
+        times = np.arange(int(self.duration_s / time_step_s)) * time_step_s
+        t = times % 30
+        throttle = np.where(t < 10, 100.0, 0.0)
+        brake = np.where(t < 15, 0.0,
+                         np.where(t < 20, 80.0, 50.0))
         return throttle, brake
 
 
@@ -117,7 +157,16 @@ class EcoModeScenario(DrivingScenario):
         else:  # Gentle deceleration
             throttle = max(35 - (t - 60) * 1.2, 0)
             brake = 10
-            
+
+        return throttle, brake
+
+    def precompute(self, time_step_s: float) -> Tuple[np.ndarray, np.ndarray]:
+        times = np.arange(int(self.duration_s / time_step_s)) * time_step_s
+        t = times % 90
+        throttle = np.where(t < 30, np.minimum(20 + t * 0.8, 40),
+                            np.where(t < 60, 35.0,
+                                     np.maximum(35 - (t - 60) * 1.2, 0)))
+        brake = np.where(t < 60, 0.0, 10.0)
         return throttle, brake
 
 
@@ -145,82 +194,56 @@ class SimulationEngine:
         print(f"Duration: {scenario.duration_s}s")
         print(f"{'='*60}\n")
         
-        steps = int(scenario.duration_s / self.time_step)
-        log_counter = 0
-        
-        for step in range(steps):
-            current_time = step * self.time_step
-            throttle, brake = scenario.get_control_inputs(current_time)
-            
-            # Execute simulation step
-            self.digital_twin.step(throttle, brake, self.time_step)
-            
-            # Log telemetry periodically
-            log_counter += 1
-            if log_counter >= log_interval:
-                self.digital_twin.log_telemetry()
-                log_counter = 0
-                
-            # Print progress
-            if step % 100 == 0:
-                progress = (step / steps) * 100
-                telemetry = self.digital_twin.get_telemetry()
-                print(f"Progress: {progress:.1f}% | "
-                      f"Speed: {telemetry['vehicle']['speed_kmh']:.1f} km/h | "
-                      f"Battery: {telemetry['battery']['soc_percent']:.1f}% | "
-                      f"Motor Temp: {telemetry['motor']['temperature_c']:.1f}°C")
-        
+        # The whole profile runs as one batched kernel call; per-step
+        # Python dispatch (and with it per-step progress output) is gone.
+        throttle_profile, brake_profile = scenario.precompute(self.time_step)
+        self.digital_twin.run_profile(throttle_profile, brake_profile,
+                                      self.time_step, log_interval)
+
+        telemetry = self.digital_twin.get_telemetry()
+        print(f"Final speed: {telemetry['vehicle']['speed_kmh']:.1f} km/h | "
+              f"Battery: {telemetry['battery']['soc_percent']:.1f}% | "
+              f"Motor Temp: {telemetry['motor']['temperature_c']:.1f}°C")
+
         print(f"\nScenario '{scenario.name}' completed!")
         self._print_summary()
-        
-    def run_custom_scenario(self, duration_s: float, throttle_profile: List[float], 
+
+    def run_custom_scenario(self, duration_s: float, throttle_profile: List[float],
                           brake_profile: List[float]):
         """Run a custom scenario with provided throttle and brake profiles"""
-        steps = len(throttle_profile)
-        
-        for step in range(steps):
-            throttle = throttle_profile[step]
-            brake = brake_profile[step]
-            
-            self.digital_twin.step(throttle, brake, self.time_step)
-            
-            if step % 10 == 0:
-                self.digital_twin.log_telemetry()
-                
+        self.digital_twin.run_profile(np.asarray(throttle_profile, dtype=np.float64),
+                                      np.asarray(brake_profile, dtype=np.float64),
+                                      self.time_step, log_interval=10)
+
     def _print_summary(self):
-        """Print simulation summary"""
-        if not self.digital_twin.telemetry_log:
+        """Print simulation summary from the columnar telemetry buffer"""
+        telemetry = self.digital_twin.telemetry
+        if not len(telemetry):
             return
-            
-        final = self.digital_twin.telemetry_log[-1]
-        initial = self.digital_twin.telemetry_log[0]
-        
-        distance_km = final['vehicle']['position_km']
-        energy_consumed = (initial['battery']['charge_kwh'] - 
-                          final['battery']['charge_kwh'])
+
+        charge = telemetry.column('battery_charge_kwh')
+        distance_km = telemetry.column('vehicle_position_km')[-1]
+        energy_consumed = charge[0] - charge[-1]
         efficiency = (distance_km / energy_consumed) if energy_consumed > 0 else 0
-        
+
         print(f"\n{'='*60}")
         print("SIMULATION SUMMARY")
         print(f"{'='*60}")
         print(f"Total Distance: {distance_km:.2f} km")
         print(f"Energy Consumed: {energy_consumed:.2f} kWh")
         print(f"Efficiency: {efficiency:.2f} km/kWh")
-        print(f"Final Battery SOC: {final['battery']['soc_percent']:.1f}%")
-        print(f"Max Speed: {max([t['vehicle']['speed_kmh'] for t in self.digital_twin.telemetry_log]):.1f} km/h")
-        print(f"Motor Health: {final['motor']['health_score']:.1f}%")
+        print(f"Final Battery SOC: {telemetry.column('battery_soc_percent')[-1]:.1f}%")
+        print(f"Max Speed: {telemetry.column('vehicle_speed_kmh').max():.1f} km/h")
+        print(f"Motor Health: {telemetry.column('motor_health_score')[-1]:.1f}%")
         print(f"{'='*60}\n")
 
 
 def main():
     """Test the simulation engine"""
-    import yaml
-    
     # Load configuration
-    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
                                'config', 'config.yaml')
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    config = load_config(config_path)
     
     # Create digital twin
     dt = DigitalTwin(config)
@@ -232,9 +255,10 @@ def main():
     sim.run_scenario("urban")
     
     # Export telemetry
-    output_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
+    output_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
                               'data', 'telemetry_urban.json')
     dt.export_telemetry(output_path)
+    dt.export_telemetry(output_path.replace('.json', '.parquet'))
     print(f"Telemetry exported to: {output_path}")
 
 
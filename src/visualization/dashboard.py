@@ -3,53 +3,159 @@ Web Dashboard for Real-time Digital Twin Monitoring
 Flask-based dashboard with real-time updates using WebSocket.
 """
 
-from flask import Flask, render_template, jsonify
+try:
+    # Must patch before Flask/threading/time are imported so all I/O
+    # runs on the cooperative event loop with native WebSocket support.
+    import eventlet
+    eventlet.monkey_patch()
+except ImportError:  # fall back to the threaded Werkzeug dev server
+    eventlet = None
+
+from flask import Flask, jsonify, send_from_directory
 from flask_socketio import SocketIO, emit
+import numpy as np
+import json
 import threading
 import time
-import json
-import yaml
 import os
 import sys
+import urllib.request
+from dataclasses import dataclass
+from typing import Any, Optional
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    import msgpack  # binary Socket.IO frames; ~half the bytes of JSON
+except ImportError:
+    msgpack = None
 
-from digital_twin.core import DigitalTwin
+if __package__ in (None, ''):  # direct script execution only
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from digital_twin.config import load_config as _load_config
+from digital_twin.core import (DigitalTwin, VELOCITY, POSITION, MOTOR_POWER,
+                               MOTOR_TEMP, MOTOR_HEALTH, BATT_CHARGE)
 from simulation.engine import SimulationEngine
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'siemens_digital_twin_secret'
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*",
+                    async_mode='eventlet' if eventlet else 'threading',
+                    serializer='msgpack' if msgpack else 'default')
+
+@dataclass
+class SimState:
+    """Shared simulation state for the socket handlers and the loop.
+
+    Single-field reads and writes are atomic in CPython, so hot paths
+    snapshot attributes without the lock; STATE_LOCK guards compound
+    check-and-set sequences (starting a run, adjusting the counter).
+    """
+    running: bool = False
+    twin: Optional[DigitalTwin] = None
+    task: Any = None
+    # Connected-browser count; emits are skipped entirely when it is zero
+    clients: int = 0
 
-# Global simulation state
-simulation_running = False
-digital_twin = None
-simulation_thread = None
+
+STATE = SimState()
+STATE_LOCK = threading.Lock()
+
+# Telemetry batch layout: speed_kmh, soc_percent, power_kw, motor_temp_c,
+# position_km, motor_health. Samples accumulate in a preallocated float32
+# block and ship as one binary 'telemetry_batch' frame every 500ms.
+BATCH_FIELDS = 6
+_BATCH_CAPACITY = 64
+_FLUSH_INTERVAL_S = 0.5
+
+
+# Parsed config, cached on the YAML file's mtime; /api/config and
+# start_simulation hit this instead of re-parsing YAML every time.
+_config_cache = None
+_config_mtime = None
 
 
 def load_config():
-    """Load configuration file"""
-    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
+    """Load configuration file (cached until config.yaml changes)"""
+    global _config_cache, _config_mtime
+
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
                                'config', 'config.yaml')
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+    mtime = os.stat(config_path).st_mtime
+    if _config_cache is None or mtime != _config_mtime:
+        _config_cache = _load_config(config_path)
+        _config_mtime = mtime
+    return _config_cache
+
+
+# JS bundles vendored next to the templates; a cold page load then costs
+# zero CDN round-trips and the browser caches the assets for a year.
+_VENDOR_DIR = os.path.join(os.path.dirname(__file__), 'static', 'vendor')
+_VENDOR_SOURCES = (
+    ('https://cdn.socket.io/4.5.4/socket.io.min.js', 'socket.io.min.js'),
+    ('https://cdn.plot.ly/plotly-2.18.0.min.js', 'plotly-2.18.0.min.js'),
+)
+
+
+def _ensure_vendor_assets():
+    """Fetch the JS bundles once so later page loads are CDN-free.
+
+    Best-effort: on an offline or read-only host the dashboard simply
+    keeps the CDN script tags.
+    """
+    try:
+        os.makedirs(_VENDOR_DIR, exist_ok=True)
+    except OSError:
+        return
+    for url, filename in _VENDOR_SOURCES:
+        target = os.path.join(_VENDOR_DIR, filename)
+        if os.path.exists(target):
+            continue
+        try:
+            with urllib.request.urlopen(url, timeout=10) as resp:
+                payload = resp.read()
+            with open(target, 'wb') as f:
+                f.write(payload)
+        except Exception:
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+
+
+# Dashboard page rendered once at startup and held in memory
+_rendered_html = None
 
 
 @app.route('/')
 def index():
     """Main dashboard page"""
-    return render_template('dashboard.html')
+    # The HTML must revalidate (it changes per deploy); the script
+    # bundles it references carry the long immutable cache instead.
+    html = _rendered_html if _rendered_html else create_dashboard_html()
+    response = app.make_response(html)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/static/vendor/<path:filename>')
+def vendor_asset(filename):
+    """Serve vendored JS bundles with aggressive immutable caching"""
+    response = send_from_directory(_VENDOR_DIR, filename, max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 
 @app.route('/api/status')
 def get_status():
     """Get current simulation status"""
-    if digital_twin is None:
+    # Lock-free snapshots; this is the polled hot path
+    twin = STATE.twin
+    if twin is None:
         return jsonify({'running': False, 'telemetry': None})
-    
-    telemetry = digital_twin.get_telemetry()
+
+    telemetry = twin.get_telemetry()
     return jsonify({
-        'running': simulation_running,
+        'running': STATE.running,
         'telemetry': telemetry
     })
 
@@ -64,6 +170,8 @@ def get_config():
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
+    with STATE_LOCK:
+        STATE.clients += 1
     print('Client connected')
     emit('connected', {'message': 'Connected to Digital Twin'})
 
@@ -71,43 +179,37 @@ def handle_connect():
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
+    with STATE_LOCK:
+        STATE.clients = max(0, STATE.clients - 1)
     print('Client disconnected')
 
 
 @socketio.on('start_simulation')
 def handle_start_simulation(data):
     """Start simulation"""
-    global simulation_running, digital_twin, simulation_thread
-    
-    if simulation_running:
-        emit('error', {'message': 'Simulation already running'})
-        return
-    
     scenario = data.get('scenario', 'urban')
+
+    # Check-and-set under the lock so two rapid start requests cannot
+    # both launch background loops.
+    with STATE_LOCK:
+        if STATE.running:
+            emit('error', {'message': 'Simulation already running'})
+            return
+        STATE.running = True
+        STATE.twin = DigitalTwin(load_config())
+
     print(f"Starting simulation with scenario: {scenario}")
-    
-    # Initialize digital twin
-    config = load_config()
-    digital_twin = DigitalTwin(config)
-    
-    # Start simulation in background thread
-    simulation_running = True
-    simulation_thread = threading.Thread(
-        target=run_simulation_loop,
-        args=(scenario,)
-    )
-    simulation_thread.daemon = True
-    simulation_thread.start()
-    
+
+    # Start simulation as a cooperative background task
+    STATE.task = socketio.start_background_task(run_simulation_loop, scenario)
+
     emit('simulation_started', {'scenario': scenario})
 
 
 @socketio.on('stop_simulation')
 def handle_stop_simulation():
     """Stop simulation"""
-    global simulation_running
-    
-    simulation_running = False
+    STATE.running = False
     print("Stopping simulation")
     emit('simulation_stopped', {})
 
@@ -115,44 +217,102 @@ def handle_stop_simulation():
 @socketio.on('set_throttle')
 def handle_set_throttle(data):
     """Manually set throttle"""
-    if digital_twin and simulation_running:
+    if STATE.twin and STATE.running:
         throttle = float(data.get('throttle', 0))
         print(f"Throttle set to: {throttle}%")
 
 
 def run_simulation_loop(scenario: str):
     """Run simulation loop and broadcast updates"""
-    global simulation_running, digital_twin
-    
+    digital_twin = STATE.twin
     engine = SimulationEngine(digital_twin, time_step=0.1)
     scenario_obj = engine.scenarios.get(scenario)
-    
+
     if not scenario_obj:
         print(f"Unknown scenario: {scenario}")
-        simulation_running = False
+        STATE.running = False
         return
     
+    # Control inputs are deterministic for a fixed scenario, so resolve
+    # the whole schedule once (vectorized per scenario class) and make
+    # the loop body a pure array lookup. The schedule length also fixes
+    # the step count, avoiding float truncation in duration / dt.
+    throttles, brakes = scenario_obj.precompute(0.1)
     step = 0
-    max_steps = int(scenario_obj.duration_s / 0.1)
-    
-    while simulation_running and step < max_steps:
+    max_steps = len(throttles)
+
+    # Pace against absolute deadlines instead of sleeping a fixed 0.1s
+    # after each step: a fixed sleep adds the step's own compute time on
+    # top, so simulated time drifts ever further behind the wall clock.
+    next_deadline = time.monotonic()
+
+    # Per-step samples land in this ring; one binary frame per flush
+    # instead of a dict-encoded emit per sample.
+    batch = np.empty((_BATCH_CAPACITY, BATCH_FIELDS), dtype=np.float32)
+    batch_idx = 0
+    batch_t0 = 0.0
+    last_flush = time.monotonic()
+
+    def flush_batch():
+        # Quantize to int16 tenths: the charts only need 0.1-unit
+        # resolution and this halves the frame size again.
+        quantized = np.clip(batch[:batch_idx] * 10.0,
+                            -32768, 32767).astype(np.int16)
+        socketio.emit('telemetry_batch', {
+            't0': batch_t0,
+            'dt': 0.1,
+            'data': quantized.tobytes()
+        })
+
+    while STATE.running and step < max_steps:
         current_time = step * 0.1
-        throttle, brake = scenario_obj.get_control_inputs(current_time)
-        
+
         # Execute simulation step
-        digital_twin.step(throttle, brake, 0.1)
-        
-        # Broadcast telemetry every 10 steps (1 second)
+        digital_twin.step(throttles[step], brakes[step], 0.1)
+
+        # Log every 10 steps (1 second)
         if step % 10 == 0:
-            telemetry = digital_twin.get_telemetry()
-            socketio.emit('telemetry_update', telemetry)
             digital_twin.log_telemetry()
-        
+
+        # Sample every step straight from the state vector — no dict
+        # construction — but only when someone is actually watching.
+        if STATE.clients > 0:
+            if batch_idx == 0:
+                batch_t0 = current_time
+            state = digital_twin._state
+            row = batch[batch_idx]
+            row[0] = state[VELOCITY] * 3.6
+            row[1] = (state[BATT_CHARGE] /
+                      digital_twin.battery.capacity_kwh) * 100
+            row[2] = state[MOTOR_POWER]
+            row[3] = state[MOTOR_TEMP]
+            row[4] = state[POSITION] / 1000.0
+            row[5] = state[MOTOR_HEALTH]
+            batch_idx += 1
+
+        now = time.monotonic()
+        if batch_idx and (now - last_flush >= _FLUSH_INTERVAL_S
+                          or batch_idx == _BATCH_CAPACITY):
+            flush_batch()
+            batch_idx = 0
+            last_flush = now
+
         step += 1
-        time.sleep(0.1)  # Real-time simulation
-    
-    simulation_running = False
+        next_deadline += 0.1
+        delay = next_deadline - time.monotonic()
+        if delay > 0:
+            socketio.sleep(delay)  # yields to the event loop
+        elif delay < -0.5:
+            # Hopelessly behind (e.g. laptop suspended); re-anchor
+            # rather than sprinting to catch up on stale deadlines.
+            print(f"Simulation loop fell {-delay:.1f}s behind; resetting pace")
+            next_deadline = time.monotonic()
     
+    STATE.running = False
+
+    if batch_idx:
+        flush_batch()
+
     # Export final telemetry
     output_path = os.path.join(
         os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
@@ -169,7 +329,7 @@ def run_simulation_loop(scenario: str):
 
 
 def create_dashboard_html():
-    """Create HTML dashboard template"""
+    """Render the dashboard HTML once into memory"""
     html_content = """<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -177,6 +337,7 @@ def create_dashboard_html():
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Siemens EV Digital Twin Dashboard</title>
     <script src="https://cdn.socket.io/4.5.4/socket.io.min.js"></script>
+    __PARSER_SCRIPT__
     <script src="https://cdn.plot.ly/plotly-2.18.0.min.js"></script>
     <style>
         * { margin: 0; padding: 0; box-sizing: border-box; }
@@ -339,23 +500,61 @@ def create_dashboard_html():
     </div>
     
     <script>
-        const socket = io();
-        
-        let speedData = {x: [], y: []};
-        let batteryData = {x: [], y: []};
-        
+        const socket = __SOCKET_INIT__;
+
+        const speedLayout = {
+            title: 'Speed Over Time',
+            xaxis: {title: 'Time (s)'},
+            yaxis: {title: 'Speed (km/h)'},
+            paper_bgcolor: 'rgba(0,0,0,0)',
+            plot_bgcolor: 'rgba(255,255,255,0.1)',
+            font: {color: '#fff'}
+        };
+        const batteryLayout = {
+            title: 'Battery State of Charge',
+            xaxis: {title: 'Time (s)'},
+            yaxis: {title: 'SOC (%)'},
+            paper_bgcolor: 'rgba(0,0,0,0)',
+            plot_bgcolor: 'rgba(255,255,255,0.1)',
+            font: {color: '#fff'}
+        };
+
+        // Build each chart once; ticks only extend the traces.
+        function initCharts() {
+            Plotly.newPlot('speed-chart', [{
+                x: [], y: [], type: 'scatter', mode: 'lines',
+                line: {color: '#4CAF50', width: 2}
+            }], speedLayout);
+            Plotly.newPlot('battery-chart', [{
+                x: [], y: [], type: 'scatter', mode: 'lines',
+                line: {color: '#FFC107', width: 2}
+            }], batteryLayout);
+        }
+        initCharts();
+
         socket.on('connect', () => {
             console.log('Connected to server');
         });
         
-        socket.on('telemetry_update', (data) => {
-            updateMetrics(data);
-            updateCharts(data);
+        // Batched binary telemetry: rows of [speed, soc, power, temp,
+        // distance, health] as int16 tenths, decoded without any JSON
+        // parse — divide by 10 to recover the value.
+        const BATCH_FIELDS = 6;
+        socket.on('telemetry_batch', (batch) => {
+            const d = batch.data;
+            const rows = (d instanceof ArrayBuffer)
+                ? new Int16Array(d)
+                : new Int16Array(d.buffer, d.byteOffset, d.byteLength / 2);
+            const n = rows.length / BATCH_FIELDS;
+            if (!n) return;
+            updateMetrics(rows, (n - 1) * BATCH_FIELDS);
+            updateCharts(batch.t0, batch.dt, rows, n);
         });
-        
+
         socket.on('simulation_started', (data) => {
             document.getElementById('status-indicator').className = 'status-indicator status-running';
             document.getElementById('status-text').textContent = 'Running: ' + data.scenario;
+            initCharts();  // clear traces from any previous run
         });
         
         socket.on('simulation_stopped', () => {
@@ -369,59 +568,27 @@ def create_dashboard_html():
             alert('Simulation complete! Data saved to: ' + data.telemetry_file);
         });
         
-        function updateMetrics(data) {
-            document.getElementById('speed').textContent = data.vehicle.speed_kmh.toFixed(1);
-            document.getElementById('battery-soc').textContent = data.battery.soc_percent.toFixed(1);
-            document.getElementById('motor-power').textContent = data.motor.power_kw.toFixed(1);
-            document.getElementById('motor-temp').textContent = data.motor.temperature_c.toFixed(1);
-            document.getElementById('distance').textContent = data.vehicle.position_km.toFixed(2);
-            document.getElementById('motor-health').textContent = data.motor.health_score.toFixed(1);
+        function updateMetrics(rows, last) {
+            document.getElementById('speed').textContent = (rows[last] / 10).toFixed(1);
+            document.getElementById('battery-soc').textContent = (rows[last + 1] / 10).toFixed(1);
+            document.getElementById('motor-power').textContent = (rows[last + 2] / 10).toFixed(1);
+            document.getElementById('motor-temp').textContent = (rows[last + 3] / 10).toFixed(1);
+            document.getElementById('distance').textContent = (rows[last + 4] / 10).toFixed(1);
+            document.getElementById('motor-health').textContent = (rows[last + 5] / 10).toFixed(1);
         }
-        
-        function updateCharts(data) {
-            speedData.x.push(data.simulation_time);
-            speedData.y.push(data.vehicle.speed_kmh);
-            
-            batteryData.x.push(data.simulation_time);
-            batteryData.y.push(data.battery.soc_percent);
-            
-            // Keep only last 100 points
-            if (speedData.x.length > 100) {
-                speedData.x.shift();
-                speedData.y.shift();
-                batteryData.x.shift();
-                batteryData.y.shift();
+
+        function updateCharts(t0, dt, rows, n) {
+            // One extendTraces per chart for the whole batch; the 100-
+            // point window drops the oldest — no chart rebuild, no O(n)
+            // array shifts.
+            const times = new Array(n), speeds = new Array(n), socs = new Array(n);
+            for (let i = 0; i < n; i++) {
+                times[i] = t0 + i * dt;
+                speeds[i] = rows[i * BATCH_FIELDS] / 10;
+                socs[i] = rows[i * BATCH_FIELDS + 1] / 10;
             }
-            
-            Plotly.newPlot('speed-chart', [{
-                x: speedData.x,
-                y: speedData.y,
-                type: 'scatter',
-                mode: 'lines',
-                line: {color: '#4CAF50', width: 2}
-            }], {
-                title: 'Speed Over Time',
-                xaxis: {title: 'Time (s)'},
-                yaxis: {title: 'Speed (km/h)'},
-                paper_bgcolor: 'rgba(0,0,0,0)',
-                plot_bgcolor: 'rgba(255,255,255,0.1)',
-                font: {color: '#fff'}
-            });
-            
-            Plotly.newPlot('battery-chart', [{
-                x: batteryData.x,
-                y: batteryData.y,
-                type: 'scatter',
-                mode: 'lines',
-                line: {color: '#FFC107', width: 2}
-            }], {
-                title: 'Battery State of Charge',
-                xaxis: {title: 'Time (s)'},
-                yaxis: {title: 'SOC (%)'},
-                paper_bgcolor: 'rgba(0,0,0,0)',
-                plot_bgcolor: 'rgba(255,255,255,0.1)',
-                font: {color: '#fff'}
-            });
+            Plotly.extendTraces('speed-chart', {x: [times], y: [speeds]}, [0], 100);
+            Plotly.extendTraces('battery-chart', {x: [times], y: [socs]}, [0], 100);
         }
         
         function startSimulation() {
@@ -436,12 +603,46 @@ def create_dashboard_html():
 </body>
 </html>"""
     
-    # Create templates directory
-    templates_dir = os.path.join(os.path.dirname(__file__), 'templates')
-    os.makedirs(templates_dir, exist_ok=True)
-    
-    with open(os.path.join(templates_dir, 'dashboard.html'), 'w') as f:
-        f.write(html_content)
+    # The page must speak the same codec as the server, so the msgpack
+    # parser is only wired in when the server-side codec is available.
+    if msgpack is not None:
+        parser_script = ('<script src="https://cdn.jsdelivr.net/npm/'
+                         'socket.io-msgpack-parser@3.0.2/dist/bundle.min.js">'
+                         '</script>')
+        socket_init = 'io({parser: MsgPackParser})'
+    else:
+        parser_script = ''
+        socket_init = 'io()'
+    html_content = (html_content
+                    .replace('__PARSER_SCRIPT__', parser_script)
+                    .replace('__SOCKET_INIT__', socket_init))
+
+    # Swap each CDN script tag for the vendored copy when it exists;
+    # the fetch itself happens in the startup task (below), so a page
+    # request never waits on the network
+    for url, filename in _VENDOR_SOURCES:
+        if os.path.exists(os.path.join(_VENDOR_DIR, filename)):
+            html_content = html_content.replace(
+                url, f'/static/vendor/{filename}')
+
+    # Served straight from memory: no template file on disk, so the
+    # server also starts cleanly on a read-only filesystem.
+    global _rendered_html
+    _rendered_html = html_content
+    return html_content
+
+
+def _prerender_dashboard():
+    """Fetch the vendored bundles and render the page ahead of traffic"""
+    _ensure_vendor_assets()
+    create_dashboard_html()
+
+
+# Pre-render at import time in the background: under gunicorn main()
+# never runs, and the first request must not block on CDN downloads. A
+# request landing before this finishes still gets a page — it just
+# references the CDN copies until the vendored ones are in place.
+threading.Thread(target=_prerender_dashboard, daemon=True).start()
 
 
 def main():
@@ -450,15 +651,19 @@ def main():
     print("Siemens Automobile Digital Twin Dashboard")
     print("="*60)
     
-    # Create HTML template
-    create_dashboard_html()
-    
+    # The import-time startup task is already fetching the vendored
+    # assets and pre-rendering the page in the background.
+
     print("\nStarting web server...")
     print("Dashboard URL: http://localhost:5000")
     print("\nPress Ctrl+C to stop the server")
     print("="*60)
     
-    socketio.run(app, host='0.0.0.0', port=5000, debug=False, allow_unsafe_werkzeug=True)
+    if eventlet is not None:
+        socketio.run(app, host='0.0.0.0', port=5000, debug=False)
+    else:
+        socketio.run(app, host='0.0.0.0', port=5000, debug=False,
+                     allow_unsafe_werkzeug=True)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,13 @@ Streams digital twin telemetry data to a Three.js web interface.
 """
 from flask import Flask, render_template
 from flask_socketio import SocketIO
+import functools
+import json
+import logging
+from collections import deque
+import logging.handlers
+import queue
+import tempfile
 import threading
 import time
 import yaml
@@ -11,79 +18,335 @@ import os
 import sys
 
 # Add project root to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if __package__ in (None, ''):  # direct script execution only
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from digital_twin.core import DigitalTwin
 from simulation.engine import SimulationEngine
 
+try:
+    import msgpack  # binary Socket.IO frames; ~half the bytes of JSON
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame as lz4frame  # sub-ms per-chunk recording compression
+except ImportError:
+    lz4frame = None
+
+try:
+    import zstandard  # recording fallback when lz4 is absent
+except ImportError:
+    zstandard = None
+
+try:
+    import orjson
+
+    class _OrjsonModule:
+        """json-module shim for python-socketio's pluggable encoder"""
+
+        @staticmethod
+        def dumps(obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        @staticmethod
+        def loads(data, **kwargs):
+            return orjson.loads(data)
+except ImportError:
+    _OrjsonModule = None
+
+from socketio import packet as sio_packet
+
+try:
+    from flask_compress import Compress  # brotli/gzip response bodies
+except ImportError:
+    Compress = None
+
 # --- FLASK APP SETUP ---
 app = Flask(__name__, template_folder='templates', static_folder='static')
 app.config['SECRET_KEY'] = 'siemens_3d_viewer_secret'
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Static assets are immutable per deploy; cache for a year client-side
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000
+if Compress is not None:
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    Compress(app)
+# orjson takes over JSON encoding wherever the msgpack codec is not in
+# play (handshakes, clients without the msgpack parser).
+_socketio_kwargs = {'json': _OrjsonModule} if _OrjsonModule else {}
+# Compress transport payloads above 128 bytes — batched frames clear
+# the threshold easily, trivial acks skip the deflate CPU cost.
+socketio = SocketIO(app, cors_allowed_origins="*",
+                    serializer='msgpack' if msgpack else 'default',
+                    http_compression=True,
+                    compression_threshold=128,
+                    **_socketio_kwargs)
 
 # --- GLOBAL STATE ---
 digital_twin = None
 simulation_thread = None
 simulation_running = False
+connected_clients = 0
+_sim_lock = threading.Lock()  # guards loop start/stop check-and-set
+# Bumped on every loop start; a loop exits the moment its own token is
+# stale, so a stop/start pair inside one 100 ms tick (page refresh)
+# cannot leave two loops stepping the shared twin.
+_sim_generation = 0
+
+# --- LOGGING ---
+# Handlers hang off a queue so the 10 Hz loop never blocks on a stdout
+# write(); a background listener drains to the stream. Production can
+# export VIEWER3D_LOG_LEVEL=WARNING to silence per-connect chatter.
+_log_queue = queue.SimpleQueue()
+logger = logging.getLogger('viewer3d')
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.setLevel(os.environ.get('VIEWER3D_LOG_LEVEL', 'INFO'))
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, logging.StreamHandler())
+_log_listener.start()
+
+# libyaml's C parser when compiled in; pure-Python SafeLoader otherwise
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config_cached(config_path, mtime_ns):
+    """Load config through a JSON sidecar, memoized on (path, mtime).
+
+    The stdlib C json parser reads the sidecar an order of magnitude
+    faster than parsing YAML, so a warm start costs a stat plus one
+    read; editing config.yaml bumps the mtime key and invalidates both
+    layers at once.
+    """
+    cache_path = config_path + '.cache.json'
+    try:
+        if os.stat(cache_path).st_mtime_ns >= mtime_ns:
+            with open(cache_path, 'r') as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    with open(config_path, 'r') as f:
+        config = yaml.load(f, Loader=_YAML_LOADER)
+
+    # Atomic best-effort sidecar write; a read-only config dir is fine
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path))
+        with os.fdopen(fd, 'w') as f:
+            json.dump(config, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+    return config
+
+
+# Developers iterating on the config can export FLASK_ENV=development
+# to bypass the memo and re-read the file on every call.
+_DEV_MODE = os.environ.get('FLASK_ENV') == 'development'
+
 
 def load_config():
-    """Load configuration file"""
+    """Load configuration file (memoized outside development mode)"""
     config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config', 'config.yaml')
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+    mtime_ns = os.stat(config_path).st_mtime_ns
+    if _DEV_MODE:
+        return _load_config_cached.__wrapped__(config_path, mtime_ns)
+    return _load_config_cached(config_path, mtime_ns)
+
+def broadcast_event(event, payload, namespace='/'):
+    """Broadcast one event, encoding the packet a single time.
+
+    socketio.emit() re-encodes the packet for every recipient, so N
+    viewers cost N serializations of the same telemetry each tick.
+    Encode one Packet and hand the bytes straight to the engine.io
+    layer for each participant instead.
+    """
+    server = socketio.server
+    try:
+        pkt = server.packet_class(sio_packet.EVENT, namespace=namespace,
+                                  data=[event, payload])
+        encoded = pkt.encode()
+        participants = list(server.manager.get_participants(namespace, None))
+    except Exception:
+        # Internals shifted underneath us; fall back to the slow path.
+        # Nothing has been sent yet, so the re-broadcast is safe.
+        socketio.emit(event, payload, namespace=namespace)
+        return
+    for sid, eio_sid in participants:
+        try:
+            if isinstance(encoded, list):  # packets with binary attachments
+                for part in encoded:
+                    server.eio.send(eio_sid, part)
+            else:
+                server.eio.send(eio_sid, encoded)
+        except Exception:
+            # One recipient dropping mid-send must not trigger a global
+            # re-emit (duplicating frames for everyone who already got
+            # the packet); the disconnect handler cleans the sid up.
+            logger.debug("send to %s failed; client likely disconnected", sid)
+
+
+def _open_recorder():
+    """Open a compressed telemetry recording for later replay.
+
+    LZ4 frames cost well under a millisecond per chunk and compress the
+    repetitive numeric stream 3-5x; zstandard stands in when lz4 is not
+    installed. Returns None (recording disabled) if neither is.
+    """
+    data_dir = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d_%H%M%S')
+    suffix = 'mpk' if msgpack else 'jsonl'
+
+    if lz4frame is not None:
+        path = os.path.join(data_dir, f'telemetry_session_{stamp}.{suffix}.lz4')
+        return lz4frame.LZ4FrameFile(
+            path, mode='wb', block_size=lz4frame.BLOCKSIZE_MAX64KB)
+    if zstandard is not None:
+        path = os.path.join(data_dir, f'telemetry_session_{stamp}.{suffix}.zst')
+        return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'))
+
+    logger.warning("record_telemetry is on but neither lz4 nor zstandard "
+                   "is installed; recording disabled.")
+    return None
+
+
+def _record_sample(recorder, telemetry):
+    """Append one sample to the recording stream"""
+    if msgpack is not None:
+        recorder.write(msgpack.packb(telemetry))  # self-delimiting
+    else:
+        recorder.write(json.dumps(telemetry).encode() + b'\n')
+
 
 # --- SIMULATION LOOP ---
-def simulation_loop():
-    """Runs the simulation and broadcasts data."""
-    global digital_twin, simulation_running
-    
-    print("▶️ Starting background simulation for 3D viewer...")
+def simulation_loop(generation):
+    """Runs the simulation and broadcasts data.
+
+    `generation` is the token this loop was started with; a newer loop
+    invalidates it, so a superseded instance stops even if it slept
+    through the running-flag going False and back to True.
+    """
+    global digital_twin
+
+    logger.info("Starting background simulation for 3D viewer...")
     config = load_config()
     digital_twin = DigitalTwin(config)
     engine = SimulationEngine(digital_twin, time_step=0.1)
     scenario = engine.scenarios['urban'] # Default to urban for continuous demo
     
     step = 0
-    simulation_running = True
-
-    while simulation_running:
-        current_time = (step * 0.1) % scenario.duration_s
-        throttle, brake = scenario.get_control_inputs(current_time)
-        
-        digital_twin.step(throttle, brake, time_step_s=0.1)
-        
-        # Broadcast telemetry at 10 Hz
-        telemetry = digital_twin.get_telemetry()
-        socketio.emit('telemetry_update', telemetry)
-        
+
+    # Control inputs repeat with the scenario period; resolve the whole
+    # cycle once (vectorized per scenario class) so the per-tick cost is
+    # a modulo and two array lookups instead of a Python call.
+    throttles, brakes = scenario.precompute(0.1)
+    n_inputs = len(throttles)
+
+    # Samples are buffered and shipped as one WebSocket frame, so the
+    # per-frame TCP/WS overhead is paid once per batch instead of per
+    # sample. The size knob trades latency against throughput.
+    batch_size = int(config.get('visualization', {})
+                     .get('telemetry_batch_size', 5))
+    # deque + clear() keeps one buffer alive for the whole stream; the
+    # old rebind-a-new-list per flush churned the allocator at 10 Hz.
+    telemetry_buffer = deque()
+    last_emit = time.monotonic()
+
+    # Delta encoding: each buffered sample carries only the top-level
+    # sections that changed since the previous one; a periodic full
+    # snapshot resyncs late joiners and bounds drift.
+    prev = {}
+    full_snapshot_every = 50  # steps, i.e. every 5 seconds
+
+    # Optional session recording for offline replay
+    recorder = None
+    if config.get('visualization', {}).get('record_telemetry', False):
+        recorder = _open_recorder()
+
+    # Deadline pacing on the monotonic clock: a fixed sleep would add
+    # the step + emit time on top of every tick and drift below 10 Hz.
+    next_t = time.monotonic()
+
+    while simulation_running and generation == _sim_generation:
+        idx = step % n_inputs  # loop the scenario for the continuous demo
+        digital_twin.step(throttles[idx], brakes[idx], time_step_s=0.1)
+
+        # Buffer telemetry; flush on batch size or 250ms, whichever first.
+        # The snapshot reads the state vector directly and skips the
+        # component/sensor sync that get_telemetry() drags in per call.
+        telemetry = digital_twin.telemetry_snapshot()
+        if step % full_snapshot_every == 0:
+            delta = telemetry
+        else:
+            delta = {k: v for k, v in telemetry.items()
+                     if prev.get(k) != v}
+        prev = telemetry
+        telemetry_buffer.append(delta)
+        if recorder is not None:
+            _record_sample(recorder, telemetry)
+        now = time.monotonic()
+        if len(telemetry_buffer) >= batch_size or now - last_emit >= 0.25:
+            broadcast_event('telemetry_update_batch', list(telemetry_buffer))
+            telemetry_buffer.clear()
+            last_emit = now
+
         step += 1
-        time.sleep(0.1) # Simulate real-time
+        next_t += 0.1
+        sleep_for = next_t - time.monotonic()
+        if sleep_for > 0:
+            # socketio.sleep yields so other greenlets/handlers run
+            socketio.sleep(sleep_for)
+
+    if recorder is not None:
+        recorder.close()
 
-    print("⏹️ Background simulation stopped.")
+    logger.info("Background simulation stopped.")
 
 # --- FLASK ROUTES & SOCKET.IO EVENTS ---
 @app.route('/')
 def index():
     """Serve the 3D viewer HTML page."""
-    return render_template('viewer_3d.html')
+    # HTML revalidates each load; the static assets carry the long cache.
+    # The template wires in the browser-side msgpack parser only when
+    # this server is actually encoding packets with it.
+    response = app.make_response(
+        render_template('viewer_3d.html', use_msgpack=msgpack is not None))
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @socketio.on('connect')
 def handle_connect():
     """Handle new client connection."""
-    global simulation_thread
-    print(f"✅ Client connected. Starting simulation stream...")
-    if simulation_thread is None or not simulation_thread.is_alive():
-        simulation_thread = threading.Thread(target=simulation_loop)
-        simulation_thread.daemon = True
-        simulation_thread.start()
+    global simulation_thread, simulation_running, connected_clients
+    global _sim_generation
+    logger.info("Client connected. Starting simulation stream...")
+    # Check-and-start under the lock: two clients connecting at once
+    # must not both pass the check and spawn duplicate loops. The task
+    # is cooperative — under eventlet/gevent a raw Thread would fight
+    # the reactor for the GIL between emits; this one yields at each
+    # socketio.sleep. Bumping the generation retires any previous loop
+    # that slept through a quick stop/start (see simulation_loop).
+    with _sim_lock:
+        connected_clients += 1
+        if not simulation_running:
+            simulation_running = True
+            _sim_generation += 1
+            simulation_thread = socketio.start_background_task(
+                simulation_loop, _sim_generation)
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection."""
-    print("❌ Client disconnected.")
-    # Optionally stop the simulation if no clients are connected
-    # global simulation_running
-    # simulation_running = False
+    global simulation_running, connected_clients
+    with _sim_lock:
+        connected_clients = max(0, connected_clients - 1)
+        if connected_clients == 0:
+            # Nobody watching: stop the loop and release the CPU
+            simulation_running = False
+            logger.info("Last client left — stopping idle simulation.")
+    logger.info("Client disconnected.")
 
 def main():
     """Start the 3D Viewer web server."""
@@ -94,7 +357,12 @@ def main():
     print("   🔗 URL: http://localhost:5001")
     print("\nPress Ctrl+C to stop the server")
     print("============================================================")
-    
+
+    # Warm the compiled physics kernel before accepting clients, so the
+    # first viewer's stream doesn't stall on numba's first-call JIT.
+    DigitalTwin(load_config()).step(0.0, 0.0, 0.1)
+
+
     socketio.run(app, host='0.0.0.0', port=5001, debug=False, allow_unsafe_werkzeug=True)
 
 if __name__ == '__main__':